@@ -2,10 +2,12 @@
 API route definitions and endpoint handlers.
 """
 
-from fastapi import APIRouter, HTTPException, Request, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response, WebSocket, status
+from typing import List, Optional, Literal
+from datetime import datetime
 import numpy as np
 import logging
+import secrets
 import time
 
 from app.models.schemas import (
@@ -15,14 +17,99 @@ from app.models.schemas import (
     HealthResponse,
     BatchFeatureInput,
     BatchPredictionResponse,
-    RiskRecommendation
+    RiskRecommendation,
+    AuditQueryResponse,
+    LabelBatchInput,
+    ProfilingStartInput,
+    WhatIfInput,
+    WhatIfResponse
 )
 from app.core.config import settings
+from app.services.admission import INTERACTIVE, BATCH, AdmissionRejected, deadline_from_header
+from app.services.profiler import run_in_threadpool_profiled
+from app.services.stream_scoring import StreamScoringSession
+from app.services.what_if import sensitivity_sweep
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Clinical action text returned alongside /predict and /batch-predict risk categories
+CLINICAL_ACTIONS = {
+    "Low": "Routine surveillance recommended. Continue annual screening mammography.",
+    "Medium": "Additional diagnostic testing recommended. Consider ultrasound, MRI, or biopsy for confirmation.",
+    "High": "Immediate clinical attention required. Urgent referral to oncology specialist recommended."
+}
+
+
+def _admission(priority: str):
+    """
+    Dependency that holds an inference slot of the given priority class for the request.
+    
+    Rejected requests get a fast 503 with Retry-After. Clients may shorten the
+    queue wait with an ``X-Request-Deadline-Ms`` header.
+    """
+    async def dependency(request: Request):
+        admission = getattr(request.app.state, "admission", None)
+        if admission is None:
+            yield
+            return
+        
+        timeout = deadline_from_header(request.headers.get("X-Request-Deadline-Ms"), admission.queue_timeout)
+        try:
+            await admission.acquire(priority, timeout)
+        except AdmissionRejected as e:
+            logger.warning(f"Request shed: {e.reason}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Service overloaded: {e.reason}",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        
+        try:
+            yield
+        finally:
+            admission.release(priority)
+    
+    return dependency
+
+
+def _require_admin(request: Request) -> None:
+    """Dependency rejecting requests without the configured X-Admin-Token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled"
+        )
+    
+    token = request.headers.get("X-Admin-Token", "")
+    if not secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token"
+        )
+
+
+def _record_drift(request: Request, feature_array: np.ndarray, probabilities) -> None:
+    """Feed scored rows to the drift monitor, if one is configured."""
+    drift_monitor = getattr(request.app.state, "drift_monitor", None)
+    if drift_monitor is not None:
+        drift_monitor.update(feature_array, probabilities)
+
+
+def _record_audit(request: Request, endpoint: str, feature_array: np.ndarray,
+                  probabilities, risk_categories, model_version: str, latency_ms: float,
+                  case_ids) -> None:
+    """Append scored rows to the audit log buffer and index their case ids for label joins."""
+    audit_log = getattr(request.app.state, "audit_log", None)
+    if audit_log is not None:
+        audit_log.record(endpoint, feature_array, probabilities, risk_categories, model_version,
+                         latency_ms, case_ids)
+    
+    performance_monitor = getattr(request.app.state, "performance_monitor", None)
+    if performance_monitor is not None:
+        performance_monitor.record_predictions(case_ids, probabilities, risk_categories)
+
 
 @router.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check(request: Request):
@@ -55,7 +142,8 @@ async def get_model_info(request: Request):
     return ml_service.get_model_info()
 
 
-@router.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
+@router.post("/predict", response_model=PredictionResponse, tags=["Prediction"],
+             dependencies=[Depends(_admission(INTERACTIVE))])
 async def predict(features: FeatureInput, request: Request):
     """
     Make binary classification prediction (Benign/Malignant) with integrated risk stratification.
@@ -81,7 +169,13 @@ async def predict(features: FeatureInput, request: Request):
         feature_array = np.array([features.to_list()])
 
         # Get comprehensive prediction details (includes explanations)
-        details = ml_service.get_prediction_details(feature_array)
+        start_time = time.perf_counter()
+        details = await run_in_threadpool_profiled(ml_service.get_prediction_details, feature_array)
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        _record_drift(request, feature_array, [details['probability_malignant']])
+        _record_audit(request, "predict", feature_array, [details['probability_malignant']],
+                      [details['risk_category']], details['model_version'], latency_ms,
+                      [features.case_id])
         
         # Calculate risk stratification
         risk_score = details['probability_malignant']
@@ -93,13 +187,13 @@ async def predict(features: FeatureInput, request: Request):
         # Determine risk category and clinical action
         if risk_score < LOW_THRESHOLD:
             risk_category = "Low Risk"
-            clinical_action = "Routine surveillance recommended. Continue annual screening mammography."
+            clinical_action = CLINICAL_ACTIONS["Low"]
         elif risk_score <= HIGH_THRESHOLD:
             risk_category = "Medium Risk"
-            clinical_action = "Additional diagnostic testing recommended. Consider ultrasound, MRI, or biopsy for confirmation."
+            clinical_action = CLINICAL_ACTIONS["Medium"]
         else:
             risk_category = "High Risk"
-            clinical_action = "Immediate clinical attention required. Urgent referral to oncology specialist recommended."
+            clinical_action = CLINICAL_ACTIONS["High"]
 
         logger.info(f"Prediction made: {details['diagnosis']} (confidence: {details['confidence']:.4f}, risk: {risk_category})")
 
@@ -112,7 +206,8 @@ async def predict(features: FeatureInput, request: Request):
             risk_score=risk_score,
             clinical_action=clinical_action,
             model_version=details['model_version'],
-            explanations=details.get('explanations', [])
+            explanations=details.get('explanations', []),
+            uncertainty=details.get('uncertainty')
         )
         
     except ValueError as e:
@@ -129,7 +224,8 @@ async def predict(features: FeatureInput, request: Request):
         )
 
 
-@router.post("/risk-stratify", response_model=RiskStratificationResponse, tags=["Risk Stratification"])
+@router.post("/risk-stratify", response_model=RiskStratificationResponse, tags=["Risk Stratification"],
+             dependencies=[Depends(_admission(INTERACTIVE))])
 async def risk_stratify(features: FeatureInput, request: Request):
     """
     Perform risk stratification with clinical recommendations.
@@ -155,7 +251,13 @@ async def risk_stratify(features: FeatureInput, request: Request):
         feature_array = np.array([features.to_list()])
 
         # Get comprehensive prediction details (includes explanations)
-        details = ml_service.get_prediction_details(feature_array)
+        start_time = time.perf_counter()
+        details = await run_in_threadpool_profiled(ml_service.get_prediction_details, feature_array)
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        _record_drift(request, feature_array, [details['probability_malignant']])
+        _record_audit(request, "risk-stratify", feature_array, [details['probability_malignant']],
+                      [details['risk_category']], details['model_version'], latency_ms,
+                      [features.case_id])
         
         logger.info(
             f"Risk stratification: {details['risk_category']} "
@@ -171,6 +273,7 @@ async def risk_stratify(features: FeatureInput, request: Request):
             thresholds=details['thresholds'],
             model_version=details['model_version']
             ,explanations=details.get('explanations', [])
+            ,uncertainty=details.get('uncertainty')
         )
         
     except ValueError as e:
@@ -187,12 +290,14 @@ async def risk_stratify(features: FeatureInput, request: Request):
         )
 
 
-@router.post("/batch-predict", response_model=BatchPredictionResponse, tags=["Prediction"])
+@router.post("/batch-predict", response_model=BatchPredictionResponse, tags=["Prediction"],
+             dependencies=[Depends(_admission(BATCH))])
 async def batch_predict(batch_input: BatchFeatureInput, request: Request):
     """
     Perform batch predictions on multiple samples (max 100 per request).
     
     - **samples**: List of feature sets
+    - **precision**: `float64` (default) or `float32` for the reduced-precision path
     - Returns list of predictions with processing time
     """
     try:
@@ -205,29 +310,48 @@ async def batch_predict(batch_input: BatchFeatureInput, request: Request):
             )
         
         start_time = time.time()
-        predictions = []
         
-        for sample in batch_input.samples:
-            feature_array = np.array([sample.to_list()])
-            prediction, confidence = ml_service.predict(feature_array)
-            probabilities = ml_service.predict_proba(feature_array)
-            
-            diagnosis = "Malignant" if prediction == 1 else "Benign"
-            
+        # Score all samples in one vectorized call in the requested precision
+        dtype = np.float32 if batch_input.precision == "float32" else np.float64
+        feature_array = np.array([sample.to_list() for sample in batch_input.samples], dtype=dtype)
+        # With a trained ensemble, one matrix product scores the model and its uncertainty
+        uncertainty = await run_in_threadpool_profiled(ml_service.predict_uncertainty_batch, feature_array)
+        if uncertainty is not None:
+            probabilities = uncertainty["probability"]
+        else:
+            probabilities = await run_in_threadpool_profiled(ml_service.predict_proba_batch, feature_array)
+        risk_categories = ml_service.stratify_risk_batch(probabilities)
+        model_version = ml_service.model_metadata.get("model_name", "Logistic Regression v1.0")
+        
+        predictions = []
+        uncertainty_items = ml_service.uncertainty_items(uncertainty, len(probabilities))
+        for prob_malignant, tier, item in zip(probabilities.tolist(), risk_categories.tolist(), uncertainty_items):
+            is_malignant = prob_malignant > 0.5
             predictions.append(
                 PredictionResponse(
-                    diagnosis=diagnosis,
-                    confidence=confidence,
-                    probability_malignant=float(probabilities[1]),
-                    probability_benign=float(probabilities[0]),
-                    model_version=ml_service.model_metadata.get("model_name", "Logistic Regression v1.0")
+                    diagnosis="Malignant" if is_malignant else "Benign",
+                    confidence=prob_malignant if is_malignant else 1.0 - prob_malignant,
+                    probability_malignant=prob_malignant,
+                    probability_benign=1.0 - prob_malignant,
+                    risk_category=f"{tier} Risk",
+                    risk_score=prob_malignant,
+                    clinical_action=CLINICAL_ACTIONS[tier],
+                    model_version=model_version,
+                    uncertainty=item
                 )
             )
         
         processing_time = time.time() - start_time
         
+        _record_drift(request, feature_array, probabilities)
+        _record_audit(
+            request, "batch-predict", feature_array, probabilities, risk_categories,
+            model_version, processing_time * 1000 / len(predictions),
+            [sample.case_id for sample in batch_input.samples]
+        )
+        
         logger.info(
-            f"Batch prediction completed: {len(predictions)} samples "
+            f"Batch prediction completed: {len(predictions)} samples ({batch_input.precision}) "
             f"in {processing_time:.3f}s ({processing_time/len(predictions)*1000:.1f}ms per sample)"
         )
         
@@ -251,6 +375,284 @@ async def batch_predict(batch_input: BatchFeatureInput, request: Request):
         )
 
 
+@router.post("/what-if", response_model=WhatIfResponse, tags=["Risk Stratification"],
+             dependencies=[Depends(_admission(INTERACTIVE))])
+async def what_if(sweep: WhatIfInput, request: Request):
+    """
+    Sensitivity sweep: how the malignancy probability changes as one or two features vary.
+
+    - **features**: Base case (all 30 features)
+    - **axes**: One feature (curve) or two features (surface) with `start`, `stop` and `steps`
+    - Returns the probability and risk tier at every grid point, plus where the
+      curve or surface crosses the Low/Medium and Medium/High thresholds
+
+    The whole grid is scored in one vectorized call; sweeps are not recorded in
+    the audit log or drift monitor.
+    """
+    try:
+        ml_service = request.app.state.ml_service
+
+        if not ml_service.is_loaded():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Model is not loaded. Please contact administrator."
+            )
+
+        start_time = time.time()
+        axes = [(axis.column, axis.start, axis.stop, axis.steps) for axis in sweep.axes]
+        result = await run_in_threadpool_profiled(
+            sensitivity_sweep, ml_service, sweep.features.to_list(), axes
+        )
+        processing_time = time.time() - start_time
+
+        logger.info(
+            f"What-if sweep over {[axis.feature for axis in sweep.axes]}: "
+            f"{result['grid_size']} cases in {processing_time:.3f}s"
+        )
+
+        return WhatIfResponse(
+            features=[axis.feature for axis in sweep.axes],
+            model_version=ml_service.model_metadata.get("model_name", "Logistic Regression v1.0"),
+            processing_time=processing_time,
+            **result
+        )
+
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid input: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"What-if sweep error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"What-if sweep failed: {str(e)}"
+        )
+
+
+@router.websocket("/ws/score")
+async def stream_score(
+    websocket: WebSocket,
+    binary_format: Literal["float64", "float32"] = "float64",
+    explain: bool = True
+):
+    """
+    Streaming risk stratification over a WebSocket.
+    
+    Send JSON messages `{"id": ..., "features": {...}}` or `{"id": ..., "values": [30 floats]}`
+    (or lists of them), or binary frames of packed records (uint64 id + 30 floats in
+    `binary_format`). Cases are micro-batched internally and results are pushed back as
+    `{"results": [...]}` with `/risk-stratify` fields tagged by `id`.
+    """
+    ml_service = websocket.app.state.ml_service
+    
+    if not ml_service.is_loaded():
+        await websocket.close(code=1013, reason="Model is not loaded")
+        return
+    
+    await StreamScoringSession(websocket, binary_format=binary_format, explain=explain).run()
+
+
+@router.get("/drift", tags=["Monitoring"])
+async def get_drift_report(request: Request):
+    """
+    Input and output drift over the sliding window of recent predictions.
+    
+    - Per-feature population stability index (PSI) and standardized mean shift
+      against the training scaler statistics
+    - PSI and standardized shift of the malignancy probability
+    """
+    drift_monitor = getattr(request.app.state, "drift_monitor", None)
+    
+    if drift_monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Drift monitoring is not available"
+        )
+    
+    return drift_monitor.report()
+
+
+@router.get(
+    "/audit", response_model=AuditQueryResponse, tags=["Monitoring"], dependencies=[Depends(_require_admin)]
+)
+async def query_audit_log(
+    request: Request,
+    start: Optional[datetime] = Query(None, description="Earliest prediction time (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Latest prediction time (inclusive)"),
+    model_version: Optional[str] = Query(None, description="Only records scored by this model version"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum records returned"),
+    include_features: bool = Query(False, description="Include the 30 input features per record")
+):
+    """
+    Query stored predictions by time range and model version.
+    
+    Only records already flushed to disk by the background writer are returned.
+    Segments are decompressed in a worker thread so long scans never block inference.
+    """
+    audit_log = getattr(request.app.state, "audit_log", None)
+    
+    if audit_log is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Audit log is disabled"
+        )
+    
+    def scan():
+        records = audit_log.query(
+            start=start,
+            end=end,
+            model_version=model_version,
+            limit=limit,
+            include_features=include_features
+        )
+        return records, audit_log.stats()
+    
+    records, stats = await run_in_threadpool_profiled(scan)
+    
+    return AuditQueryResponse(
+        records=records,
+        total_records=len(records),
+        pending=stats["pending"],
+        stats=stats
+    )
+
+
+@router.post("/labels", tags=["Monitoring"], dependencies=[Depends(_require_admin)])
+async def submit_labels(labels: LabelBatchInput, request: Request):
+    """
+    Submit confirmed diagnoses for previously scored cases.
+    
+    Labels are joined with stored predictions by `case_id`. Labels whose
+    prediction is not known yet are held and joined when it arrives. A label
+    sent again for a joined case is counted as a duplicate, or replaces the
+    earlier diagnosis if it differs.
+    """
+    performance_monitor = getattr(request.app.state, "performance_monitor", None)
+    
+    if performance_monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Performance monitoring is not available"
+        )
+    
+    pairs = [(label.case_id, label.to_label()) for label in labels.labels]
+    result = performance_monitor.record_labels(pairs)
+    
+    # Persist labels so joins survive a restart (replayed by load_from_audit)
+    audit_log = getattr(request.app.state, "audit_log", None)
+    if audit_log is not None:
+        audit_log.record_labels(pairs)
+    
+    logger.info(
+        f"Labels received: {len(labels.labels)} ({result['matched']} joined, "
+        f"{result['duplicates']} duplicates, {result['corrected']} corrected)"
+    )
+    
+    return result
+
+
+@router.get("/performance", tags=["Monitoring"])
+async def get_live_performance(request: Request):
+    """
+    Rolling live performance of the deployed model.
+    
+    - Confusion matrix, sensitivity and specificity overall and per risk tier
+    - Computed from predictions joined with late-arriving labels
+    """
+    performance_monitor = getattr(request.app.state, "performance_monitor", None)
+    
+    if performance_monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Performance monitoring is not available"
+        )
+    
+    return performance_monitor.report()
+
+
+@router.get("/admission", tags=["Monitoring"])
+async def get_admission_stats(request: Request):
+    """
+    Admission control state: in-flight slots, queue depth and shed counters per priority class.
+    """
+    admission = getattr(request.app.state, "admission", None)
+    
+    if admission is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Admission control is disabled"
+        )
+    
+    return admission.stats()
+
+
+@router.post("/admin/profiling/start", tags=["Admin"], dependencies=[Depends(_require_admin)])
+async def start_profiling(config: ProfilingStartInput, request: Request):
+    """
+    Arm request profiling for one endpoint.
+    
+    - **endpoint**: Full request path, e.g. `/api/v1/predict`
+    - **mode**: `cprofile` (deterministic) or `sampling` (stack sampling)
+    - **requests**: Profile the next N matching requests
+    - **sample_rate**: Profile only this fraction of matching requests
+    """
+    try:
+        return request.app.state.profiler.start(
+            endpoint=config.endpoint,
+            mode=config.mode,
+            requests=config.requests,
+            sample_rate=config.sample_rate
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+@router.post("/admin/profiling/stop", tags=["Admin"], dependencies=[Depends(_require_admin)])
+async def stop_profiling(request: Request):
+    """Disarm request profiling. Collected results stay available for download."""
+    return {"session": request.app.state.profiler.stop()}
+
+
+@router.get("/admin/profiling/status", tags=["Admin"], dependencies=[Depends(_require_admin)])
+async def get_profiling_status(request: Request):
+    """Current profiling session and progress."""
+    return request.app.state.profiler.status()
+
+
+@router.get("/admin/profiling/download", tags=["Admin"], dependencies=[Depends(_require_admin)])
+async def download_profile(request: Request):
+    """
+    Download the collected profile.
+    
+    - cprofile sessions: `pstats` dump (`.prof`) for snakeviz, flameprof or gprof2dot
+    - sampling sessions: collapsed stacks (`.folded`) for flamegraph.pl or speedscope
+    """
+    profiler = request.app.state.profiler
+    data = profiler.export()
+    
+    if not data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No profile data collected"
+        )
+    
+    if profiler.session.mode == "cprofile":
+        filename, media_type = "profile.prof", "application/octet-stream"
+    else:
+        filename, media_type = "profile.folded", "text/plain"
+    
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/features", tags=["Metadata"])
 async def get_feature_info():
     """
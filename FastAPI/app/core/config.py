@@ -2,8 +2,9 @@
 Application configuration settings.
 """
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -27,11 +28,58 @@ class Settings(BaseSettings):
     
     # Model Configuration
     MODELS_DIR: Path = Path(__file__).parent.parent.parent.parent / "models"
+    MODEL_ID: str = "20251213_184350"
     
     # Risk Stratification Thresholds (optimized values from ML notebook)
     LOW_RISK_THRESHOLD: float = 0.20
     HIGH_RISK_THRESHOLD: float = 0.70
     
+    # Prediction Uncertainty (bootstrap ensemble, loaded when ensemble_<MODEL_ID>.npz exists)
+    UNCERTAINTY_INTERVAL: float = Field(default=0.90, gt=0, lt=1)
+    
+    # Drift Monitoring
+    DRIFT_WINDOW_SIZE: int = 1000
+    DRIFT_WINDOW_BUCKETS: int = 10
+    DRIFT_HISTOGRAM_BINS: int = 10
+    DRIFT_PSI_ALERT: float = 0.2
+    # Training CSV used as the drift baseline; without it the scaler's normal approximation is used
+    DRIFT_REFERENCE_DATA: Optional[Path] = Path(__file__).parent.parent.parent.parent / "data.csv"
+    
+    # Prediction Audit Log
+    AUDIT_ENABLED: bool = True
+    AUDIT_LOG_DIR: Path = Path(__file__).parent.parent.parent / "audit_logs"
+    AUDIT_FLUSH_INTERVAL: float = 5.0
+    AUDIT_MAX_BUFFER: int = 100000
+    AUDIT_MAX_SEGMENT_ROWS: int = 50000
+    AUDIT_RETENTION_DAYS: Optional[float] = None
+    AUDIT_ROLL_INTERVAL: float = 3600.0  # seconds of flushes compacted into one segment
+    
+    # Live Performance Monitoring
+    PERFORMANCE_WINDOW_DAYS: int = 30
+    PERFORMANCE_MAX_PENDING: int = 1000000
+    
+    # Admission Control (inference concurrency and load shedding)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 4
+    ADMISSION_BATCH_MAX_IN_FLIGHT: int = 2
+    ADMISSION_MAX_QUEUE_INTERACTIVE: int = 64
+    ADMISSION_MAX_QUEUE_BATCH: int = 8
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+    
+    # Admin / Profiling (admin endpoints are disabled while ADMIN_TOKEN is unset)
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_INTERVAL: float = 0.001
+    
+    # WebSocket Streaming Scoring
+    WS_MAX_BATCH: int = 256
+    WS_BATCH_WINDOW_MS: float = 2.0
+    WS_MAX_PENDING: int = 1024
+    WS_MAX_OUTGOING: int = 16
+    
+    # Dataset Cache (memory-mapped copies of CSV datasets, keyed by file hash)
+    DATASET_CACHE_DIR: Path = Path(__file__).parent.parent.parent / ".dataset_cache"
+    
     # Feature Configuration
     EXPECTED_FEATURES: int = 30
     FEATURE_NAMES: List[str] = [
@@ -10,6 +10,12 @@ import logging
 from app.api import routes
 from app.core.config import settings
 from app.services.ml_service import MLService
+from app.services.dataset_store import DatasetStore
+from app.services.drift_monitor import DriftMonitor
+from app.services.audit_log import AuditLog
+from app.services.performance_monitor import PerformanceMonitor
+from app.services.admission import AdmissionController
+from app.services.profiler import RequestProfiler, ProfilingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -39,14 +45,56 @@ async def lifespan(app: FastAPI):
         ml_service.load_models()
         app.state.ml_service = ml_service
         logger.info("✅ ML models loaded successfully")
+        
+        # Drift monitor compares live inputs against the scaler's training statistics
+        if ml_service.scaler is not None and hasattr(ml_service.scaler, "mean_"):
+            app.state.drift_monitor = DriftMonitor.from_scaler(ml_service.scaler, ml_service.feature_names)
+            # Empirical baseline from the training data; a bad path or file must not stop the API from starting
+            reference = None
+            if settings.DRIFT_REFERENCE_DATA is not None:
+                try:
+                    reference = DatasetStore.from_settings().load(settings.DRIFT_REFERENCE_DATA)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not load drift reference {settings.DRIFT_REFERENCE_DATA}: {str(e)}")
+            if reference is not None:
+                app.state.drift_monitor.set_reference(
+                    reference.features, ml_service.predict_proba_batch(reference.features)
+                )
+                logger.info(f"✅ Drift baseline set from {settings.DRIFT_REFERENCE_DATA} ({len(reference)} rows)")
+            else:
+                logger.warning(
+                    "⚠️ Drift baseline falls back to a normal approximation of the scaler statistics "
+                    "and no probability baseline - expect inflated PSI on skewed features"
+                )
+        else:
+            app.state.drift_monitor = None
+            logger.warning("⚠️ No fitted scaler - drift monitoring disabled")
     except Exception as e:
         logger.error(f"❌ Failed to load ML models: {str(e)}")
         raise
     
+    # Audit log: records are buffered in memory and written by a background thread
+    if settings.AUDIT_ENABLED:
+        app.state.audit_log = AuditLog.from_settings()
+        app.state.audit_log.start()
+        logger.info(f"✅ Audit log writing to {settings.AUDIT_LOG_DIR}")
+    else:
+        app.state.audit_log = None
+    
+    # Performance monitor joins indexed predictions with late-arriving labels
+    app.state.performance_monitor = PerformanceMonitor.from_settings()
+    if app.state.audit_log is not None:
+        app.state.performance_monitor.load_from_audit(app.state.audit_log)
+    
+    # Admission control bounds concurrent inference and sheds excess load
+    app.state.admission = AdmissionController.from_settings() if settings.ADMISSION_ENABLED else None
+    
     yield
     
     # Shutdown: Cleanup
     logger.info("Shutting down application...")
+    if app.state.audit_log is not None:
+        app.state.audit_log.stop()
 
 
 # Create FastAPI application
@@ -68,6 +116,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request profiler: idle (pass-through) until armed via the admin endpoints
+profiler = RequestProfiler()
+app.state.profiler = profiler
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 # Include API routes
 app.include_router(routes.router, prefix=settings.API_PREFIX)
 
@@ -3,7 +3,7 @@ Pydantic models for request/response validation.
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -49,6 +49,9 @@ class FeatureInput(BaseModel):
     symmetry_worst: float = Field(..., ge=0, le=1, description="Worst symmetry")
     fractal_dimension_worst: float = Field(..., ge=0, description="Worst 'coastline approximation' - 1")
     
+    # Optional identifier used to join the prediction with its later diagnosis
+    case_id: Optional[str] = Field(None, max_length=128, description="Client case identifier for joining late-arriving labels")
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -80,6 +83,16 @@ class FeatureInput(BaseModel):
         ]
 
 
+class PredictionUncertainty(BaseModel):
+    """Bootstrap-ensemble uncertainty of a single prediction."""
+    
+    probability_lower: float = Field(..., ge=0, le=1, description="Lower bound of the malignancy probability interval")
+    probability_upper: float = Field(..., ge=0, le=1, description="Upper bound of the malignancy probability interval")
+    tier_stability: float = Field(..., ge=0, le=1, description="Fraction of ensemble models assigning the same risk tier")
+    interval: float = Field(..., description="Coverage of the probability interval, e.g. 0.9")
+    ensemble_size: int = Field(..., description="Number of bootstrap models in the ensemble")
+
+
 class PredictionResponse(BaseModel):
     """Response schema for binary prediction with integrated risk stratification."""
     
@@ -94,6 +107,7 @@ class PredictionResponse(BaseModel):
     model_version: str = Field(..., description="Model version used for prediction")
     timestamp: datetime = Field(default_factory=datetime.now, description="Prediction timestamp")
     explanations: Optional[List[dict]] = Field(None, description="Optional explanation items describing feature contributions")
+    uncertainty: Optional[PredictionUncertainty] = Field(None, description="Probability interval and tier stability (when an ensemble is trained)")
 
 
 class RiskRecommendation(BaseModel):
@@ -117,6 +131,7 @@ class RiskStratificationResponse(BaseModel):
     model_version: str = Field(..., description="Model version used")
     timestamp: datetime = Field(default_factory=datetime.now, description="Prediction timestamp")
     explanations: Optional[List[dict]] = Field(None, description="Optional explanation items describing feature contributions")
+    uncertainty: Optional[PredictionUncertainty] = Field(None, description="Probability interval and tier stability (when an ensemble is trained)")
 
 
 class HealthResponse(BaseModel):
@@ -132,6 +147,9 @@ class BatchFeatureInput(BaseModel):
     """Batch prediction input schema."""
     
     samples: List[FeatureInput] = Field(..., description="List of feature samples")
+    precision: Literal["float64", "float32"] = Field(
+        "float64", description="Inference precision; float32 halves memory traffic for large batches"
+    )
     
     @field_validator('samples')
     @classmethod
@@ -150,3 +168,126 @@ class BatchPredictionResponse(BaseModel):
     total_samples: int = Field(..., description="Total number of samples processed")
     processing_time: float = Field(..., description="Total processing time in seconds")
     timestamp: datetime = Field(default_factory=datetime.now, description="Batch processing timestamp")
+
+
+class AuditRecord(BaseModel):
+    """Single stored prediction from the audit log."""
+    
+    timestamp: datetime = Field(..., description="Time the prediction was recorded")
+    endpoint: str = Field(..., description="Endpoint that produced the prediction")
+    probability_malignant: float = Field(..., description="Probability of malignancy")
+    risk_category: Optional[str] = Field(None, description="Risk level: Low, Medium, or High")
+    model_version: str = Field(..., description="Model version used for prediction")
+    latency_ms: float = Field(..., description="Scoring latency in milliseconds")
+    case_id: Optional[str] = Field(None, description="Client case identifier")
+    features: Optional[Dict[str, float]] = Field(None, description="Input features (when requested)")
+
+
+class AuditQueryResponse(BaseModel):
+    """Audit log query response schema."""
+    
+    records: List[AuditRecord] = Field(..., description="Matching audit records, oldest first")
+    total_records: int = Field(..., description="Number of records returned")
+    pending: int = Field(..., description="Records buffered in memory and not yet queryable")
+    stats: Dict[str, Any] = Field(..., description="Writer counters (written, dropped) and on-disk footprint")
+
+
+class LabelInput(BaseModel):
+    """Ground-truth diagnosis for a previously scored case."""
+    
+    case_id: str = Field(..., min_length=1, max_length=128, description="Case identifier sent with the prediction")
+    diagnosis: str = Field(..., description="Confirmed diagnosis: Malignant/M or Benign/B")
+    
+    @field_validator('diagnosis')
+    @classmethod
+    def validate_diagnosis(cls, v):
+        normalized = v.strip().upper()
+        if normalized in ("M", "MALIGNANT"):
+            return "Malignant"
+        if normalized in ("B", "BENIGN"):
+            return "Benign"
+        raise ValueError("Diagnosis must be Malignant/M or Benign/B")
+    
+    def to_label(self) -> int:
+        """Binary label matching the model's classes (1 = Malignant)."""
+        return 1 if self.diagnosis == "Malignant" else 0
+
+
+class LabelBatchInput(BaseModel):
+    """Batch of ground-truth labels."""
+    
+    labels: List[LabelInput] = Field(..., description="Confirmed diagnoses")
+    
+    @field_validator('labels')
+    @classmethod
+    def validate_labels(cls, v):
+        if len(v) == 0:
+            raise ValueError("At least one label is required")
+        if len(v) > 10000:
+            raise ValueError("Maximum 10000 labels per request")
+        return v
+
+
+class ProfilingStartInput(BaseModel):
+    """Request to arm request profiling."""
+    
+    endpoint: str = Field(..., description="Request path to profile, e.g. /api/v1/predict")
+    mode: Literal["cprofile", "sampling"] = Field("cprofile", description="Deterministic cProfile or stack sampling")
+    requests: Optional[int] = Field(None, gt=0, le=10000, description="Number of requests to profile")
+    sample_rate: float = Field(1.0, gt=0, le=1, description="Fraction of matching requests to profile")
+
+
+class SweepAxis(BaseModel):
+    """One feature varied in a what-if sweep."""
+    
+    feature: str = Field(..., description="Feature to vary, e.g. radius_mean or concave_points_worst")
+    start: float = Field(..., description="First value of the sweep")
+    stop: float = Field(..., description="Last value of the sweep")
+    steps: int = Field(50, ge=2, le=1000, description="Number of evenly spaced values")
+    
+    @field_validator('feature')
+    @classmethod
+    def validate_feature(cls, v):
+        name = v.strip().replace(" ", "_")
+        if name == "case_id" or name not in FeatureInput.model_fields:
+            raise ValueError(f"Unknown feature: {v}")
+        return name
+    
+    @property
+    def column(self) -> int:
+        """Column index of the feature in ``FeatureInput.to_list()`` order."""
+        return list(FeatureInput.model_fields).index(self.feature)
+
+
+class WhatIfInput(BaseModel):
+    """What-if sensitivity sweep around a single case."""
+    
+    features: FeatureInput = Field(..., description="Base case")
+    axes: List[SweepAxis] = Field(..., description="One feature (curve) or two features (surface) to vary")
+    
+    @field_validator('axes')
+    @classmethod
+    def validate_axes(cls, v):
+        if len(v) not in (1, 2):
+            raise ValueError("Sweep one or two features")
+        if len(v) == 2:
+            if v[0].feature == v[1].feature:
+                raise ValueError("Swept features must be different")
+            if v[0].steps * v[1].steps > 10000:
+                raise ValueError("Maximum 10000 grid points per sweep")
+        return v
+
+
+class WhatIfResponse(BaseModel):
+    """What-if sensitivity sweep response schema."""
+    
+    features: List[str] = Field(..., description="Swept features, in axis order")
+    values: List[List[float]] = Field(..., description="Swept values of each axis")
+    probabilities: list = Field(..., description="Malignancy probability curve, or surface indexed [axis 0][axis 1]")
+    risk_categories: list = Field(..., description="Risk tier (Low/Medium/High) at every grid point")
+    base_probability: float = Field(..., ge=0, le=1, description="Malignancy probability of the unmodified case")
+    base_risk_category: str = Field(..., description="Risk tier of the unmodified case")
+    boundaries: List[dict] = Field(..., description="Risk-threshold crossings within the swept range")
+    grid_size: int = Field(..., description="Number of perturbed cases scored")
+    model_version: str = Field(..., description="Model version used")
+    processing_time: float = Field(..., description="Processing time in seconds")
@@ -0,0 +1,42 @@
+"""
+Vectorized feature validation for raw numpy inputs.
+"""
+
+import numpy as np
+from typing import Tuple
+
+from app.models.schemas import FeatureInput
+
+_FEATURE_FIELDS = [name for name in FeatureInput.model_fields if name != "case_id"]
+
+
+def _feature_bounds() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lower bounds, strictness and upper bounds from the ``FeatureInput`` field constraints."""
+    lower = np.full(len(_FEATURE_FIELDS), -np.inf)
+    strict = np.zeros(len(_FEATURE_FIELDS), dtype=bool)
+    upper = np.full(len(_FEATURE_FIELDS), np.inf)
+    for i, name in enumerate(_FEATURE_FIELDS):
+        for constraint in FeatureInput.model_fields[name].metadata:
+            if getattr(constraint, "gt", None) is not None:
+                lower[i], strict[i] = constraint.gt, True
+            elif getattr(constraint, "ge", None) is not None:
+                lower[i] = constraint.ge
+            if getattr(constraint, "le", None) is not None:
+                upper[i] = constraint.le
+    return lower, strict, upper
+
+
+_LOWER, _STRICT, _UPPER = _feature_bounds()
+
+
+def validate_feature_rows(features: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ``FeatureInput`` range checks for raw feature rows.
+
+    Returns:
+        Boolean mask of valid rows
+    """
+    finite = np.isfinite(features).all(axis=1)
+    above = np.where(_STRICT, features > _LOWER, features >= _LOWER).all(axis=1)
+    below = (features <= _UPPER).all(axis=1)
+    return finite & above & below
@@ -0,0 +1,209 @@
+"""
+Admission control and load shedding for inference requests.
+"""
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed because the queue is full or its deadline passed."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded in-flight inference slots with prioritized, bounded wait queues.
+
+    Interactive requests are always dispatched before batch requests, and batch
+    traffic may hold at most ``batch_max_in_flight`` slots so interactive calls
+    keep a slot free even while a batch client floods the service. Requests that
+    find their class queue full are rejected immediately; queued requests are
+    rejected when their deadline passes.
+
+    All state lives on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        batch_max_in_flight: int = 2,
+        max_queue_interactive: int = 64,
+        max_queue_batch: int = 8,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1,
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            max_in_flight: Total concurrent inference slots
+            batch_max_in_flight: Slots batch traffic may hold at once
+            max_queue_interactive: Maximum queued interactive requests
+            max_queue_batch: Maximum queued batch requests
+            queue_timeout: Default maximum seconds a request waits for a slot
+            retry_after: Seconds advertised in Retry-After when shedding
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_max_in_flight = max(1, min(batch_max_in_flight, self.max_in_flight))
+        self.max_queue = {INTERACTIVE: max_queue_interactive, BATCH: max_queue_batch}
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._in_flight = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._queues: Dict[str, deque] = {cls: deque() for cls in PRIORITY_CLASSES}
+        self._counters = {
+            cls: {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_deadline": 0}
+            for cls in PRIORITY_CLASSES
+        }
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        """Build a controller from the configured settings."""
+        return cls(
+            max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+            batch_max_in_flight=settings.ADMISSION_BATCH_MAX_IN_FLIGHT,
+            max_queue_interactive=settings.ADMISSION_MAX_QUEUE_INTERACTIVE,
+            max_queue_batch=settings.ADMISSION_MAX_QUEUE_BATCH,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            retry_after=settings.ADMISSION_RETRY_AFTER,
+        )
+
+    def _has_capacity(self, priority: str) -> bool:
+        if sum(self._in_flight.values()) >= self.max_in_flight:
+            return False
+        if priority == BATCH and self._in_flight[BATCH] >= self.batch_max_in_flight:
+            return False
+        return True
+
+    def _can_start_now(self, priority: str) -> bool:
+        # Never overtake queued requests of the same or a higher priority
+        if self._queues[INTERACTIVE]:
+            return False
+        if priority == BATCH and self._queues[BATCH]:
+            return False
+        return self._has_capacity(priority)
+
+    async def acquire(self, priority: str = INTERACTIVE, timeout: Optional[float] = None) -> None:
+        """
+        Wait for an inference slot.
+
+        Args:
+            priority: ``INTERACTIVE`` or ``BATCH``
+            timeout: Maximum seconds to wait (defaults to ``queue_timeout``)
+
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline passes
+        """
+        counters = self._counters[priority]
+
+        if self._can_start_now(priority):
+            self._in_flight[priority] += 1
+            counters["admitted"] += 1
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.max_queue[priority]:
+            counters["shed_queue_full"] += 1
+            raise AdmissionRejected(f"{priority} queue is full", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        counters["queued"] += 1
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            # Python 3.12+ raises even when the slot was granted as the deadline fired
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            self._discard(queue, waiter)
+            counters["shed_deadline"] += 1
+            raise AdmissionRejected(f"{priority} request deadline exceeded while queued", self.retry_after)
+        except BaseException:
+            # Cancelled (e.g. client disconnected): give back a slot granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            else:
+                self._discard(queue, waiter)
+            raise
+
+        counters["admitted"] += 1
+
+    @staticmethod
+    def _discard(queue: deque, waiter: asyncio.Future) -> None:
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, priority: str = INTERACTIVE) -> None:
+        """Return a slot and hand it to the highest-priority waiter."""
+        self._in_flight[priority] -= 1
+        for cls in PRIORITY_CLASSES:
+            queue = self._queues[cls]
+            while queue and self._has_capacity(cls):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._in_flight[cls] += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, timeout: Optional[float] = None):
+        """Hold an inference slot for the duration of the ``async with`` block."""
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current occupancy, queue depth and shed counters per priority class."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "batch_max_in_flight": self.batch_max_in_flight,
+            "queue_timeout": self.queue_timeout,
+            "classes": {
+                cls: {
+                    "in_flight": self._in_flight[cls],
+                    "queue_depth": len(self._queues[cls]),
+                    "max_queue": self.max_queue[cls],
+                    **self._counters[cls],
+                }
+                for cls in PRIORITY_CLASSES
+            },
+        }
+
+
+def deadline_from_header(value: Optional[str], default: float) -> float:
+    """
+    Parse an ``X-Request-Deadline-Ms`` header into a queue timeout in seconds.
+
+    The header can only shorten the configured timeout, never extend it.
+    """
+    if not value:
+        return default
+    try:
+        ms = float(value)
+    except ValueError:
+        return default
+    if not math.isfinite(ms) or ms < 0:
+        return default
+    return min(default, ms / 1000.0)
@@ -0,0 +1,521 @@
+"""
+Prediction audit log with a background columnar segment writer.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+from app.core.config import settings
+from app.services.ml_service import RISK_TIERS
+
+logger = logging.getLogger(__name__)
+
+_TIER_CODES = {tier: code for code, tier in enumerate(RISK_TIERS)}
+
+# <kind>_<first ts ms>_<last ts ms>_<sequence>[.part].npz, kind is "audit" (predictions) or "labels";
+# ".part" files hold a single flush and are compacted into a full segment when it rolls
+_SEGMENT_PATTERN = re.compile(r"^(audit|labels)_(\d+)_(\d+)_(\d+)(\.part)?\.npz$")
+_KINDS = ("audit", "labels")
+
+# Per-row audit columns; "endpoints" / "model_versions" are lookup tables for the codes
+_AUDIT_ROW_COLUMNS = ("timestamp", "features", "probability_malignant", "risk_tier", "latency_ms", "case_id")
+
+
+@dataclass(frozen=True)
+class _Segment:
+    """In-memory index entry for one segment file."""
+    sequence: int
+    path: Path
+    first_ms: int
+    last_ms: int
+    size: int
+    rows: int
+    part: bool
+
+
+class AuditLog:
+    """
+    Append-only audit log of scored rows.
+
+    Request handlers only append tuples to a ``collections.deque`` (atomic,
+    no explicit locking), so recording never blocks on disk. A daemon thread
+    drains the buffer every ``flush_interval`` seconds into compressed ``.npz``
+    part files with one array per column. Features and probabilities are stored
+    as float32 and risk tiers / model versions as small integer codes, which
+    keeps a row at roughly 130 bytes before compression.
+
+    Parts roll into one segment once they hold ``max_segment_rows`` rows or
+    span ``roll_interval`` seconds, so the directory grows by one file per
+    roll period rather than one per flush. Segment file names carry the time
+    range they cover and are indexed in memory at startup; queries, stats and
+    retention read the index and skip segments outside the requested window
+    without touching the filesystem. Ground-truth labels go through the same
+    writer into ``labels_*.npz`` segments so that label joins can be replayed
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        flush_interval: float = 5.0,
+        max_buffer: int = 100_000,
+        max_segment_rows: int = 50_000,
+        retention_days: Optional[float] = None,
+        roll_interval: float = 3600.0,
+    ):
+        """
+        Initialize audit log.
+
+        Args:
+            log_dir: Directory for segment files (created if missing)
+            flush_interval: Seconds between background flushes
+            max_buffer: Maximum buffered rows before new records are dropped
+            max_segment_rows: Maximum rows per segment file
+            retention_days: Delete segments older than this (None keeps everything)
+            roll_interval: Seconds of flushed parts compacted into one segment
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_segment_rows = max_segment_rows
+        self.retention_days = retention_days
+        self.roll_interval = roll_interval
+
+        self._buffer: deque = deque()
+        self._label_buffer: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._index: Dict[str, List[_Segment]] = {kind: [] for kind in _KINDS}
+        self._sequence = self._load_index() + 1
+
+        self.dropped = 0
+        self.written = 0
+        self.labels_written = 0
+
+        logger.info(f"Initialized AuditLog in {self.log_dir}")
+
+    @classmethod
+    def from_settings(cls) -> "AuditLog":
+        """Build an audit log from the configured settings."""
+        return cls(
+            log_dir=settings.AUDIT_LOG_DIR,
+            flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+            max_buffer=settings.AUDIT_MAX_BUFFER,
+            max_segment_rows=settings.AUDIT_MAX_SEGMENT_ROWS,
+            retention_days=settings.AUDIT_RETENTION_DAYS,
+            roll_interval=settings.AUDIT_ROLL_INTERVAL,
+        )
+
+    def _load_index(self) -> int:
+        """Index the segment files already on disk (the only directory scan) and return the last sequence."""
+        last = 0
+        for path in self.log_dir.glob("*.npz"):
+            m = _SEGMENT_PATTERN.match(path.name)
+            if not m:
+                continue
+            part = m.group(5) is not None
+            rows = 0
+            if part:
+                # Row counts decide when parts roll; full segments never need theirs
+                with np.load(path) as seg:
+                    rows = int(seg["timestamp"].shape[0])
+            sequence = int(m.group(4))
+            self._index[m.group(1)].append(
+                _Segment(sequence, path, int(m.group(2)), int(m.group(3)), path.stat().st_size, rows, part)
+            )
+            last = max(last, sequence)
+        for segments in self._index.values():
+            segments.sort(key=lambda s: s.sequence)
+        return last
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread and flush whatever is still buffered."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.flush_interval * 2))
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.compact()
+                self._apply_retention()
+            except Exception as e:
+                logger.error(f"Audit log flush failed: {e}")
+
+    def record(
+        self,
+        endpoint: str,
+        features: np.ndarray,
+        probabilities: Sequence[float],
+        risk_categories: Sequence[str],
+        model_version: str,
+        latency_ms: float,
+        case_ids: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        """
+        Buffer scored rows for the background writer. Never blocks.
+
+        Args:
+            endpoint: Endpoint that produced the predictions
+            features: Raw input features (n_samples, n_features)
+            probabilities: Malignancy probability per row
+            risk_categories: Risk tier ("Low", "Medium", "High") per row
+            model_version: Model version used for scoring
+            latency_ms: Scoring latency attributed to each row
+            case_ids: Optional client case id per row, used to join late labels
+        """
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += len(probabilities)
+            return
+
+        ts = time.time()
+        features = np.asarray(features, dtype=np.float32)
+        if case_ids is None:
+            case_ids = [None] * len(features)
+        for row, prob, tier, case_id in zip(features, probabilities, risk_categories, case_ids):
+            self._buffer.append((ts, endpoint, row, prob, tier, model_version, latency_ms, case_id or ""))
+
+    def record_labels(self, labels: Sequence[Tuple[str, int]]) -> None:
+        """
+        Buffer ground-truth labels for the background writer. Never blocks.
+
+        Args:
+            labels: (case_id, label) pairs with label 1 for Malignant, 0 for Benign
+        """
+        if len(self._label_buffer) >= self.max_buffer:
+            self.dropped += len(labels)
+            return
+
+        ts = time.time()
+        for case_id, label in labels:
+            self._label_buffer.append((ts, case_id, int(label)))
+
+    def pending(self) -> int:
+        """Number of buffered rows not yet written to a segment."""
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Drain the buffer into one or more part files.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        with self._flush_lock:
+            while self._buffer:
+                rows: List[tuple] = []
+                while self._buffer and len(rows) < self.max_segment_rows:
+                    rows.append(self._buffer.popleft())
+                self._add("audit", self._save("audit", self._audit_columns(rows), part=True))
+                written += len(rows)
+            while self._label_buffer:
+                labels: List[tuple] = []
+                while self._label_buffer and len(labels) < self.max_segment_rows:
+                    labels.append(self._label_buffer.popleft())
+                self._add("labels", self._save("labels", self._label_columns(labels), part=True))
+                self.labels_written += len(labels)
+        self.written += written
+        return written
+
+    @staticmethod
+    def _audit_columns(rows: List[tuple]) -> Dict[str, np.ndarray]:
+        timestamps, endpoints, features, probs, tiers, versions, latencies, case_ids = zip(*rows)
+
+        endpoint_names = sorted(set(endpoints))
+        version_names = sorted(set(versions))
+        endpoint_codes = {name: i for i, name in enumerate(endpoint_names)}
+        version_codes = {name: i for i, name in enumerate(version_names)}
+
+        return {
+            "timestamp": np.asarray(timestamps, dtype=np.float64),
+            "features": np.stack(features).astype(np.float32),
+            "probability_malignant": np.asarray(probs, dtype=np.float32),
+            "risk_tier": np.asarray([_TIER_CODES.get(t, 255) for t in tiers], dtype=np.uint8),
+            "model_version": np.asarray([version_codes[v] for v in versions], dtype=np.uint16),
+            "model_versions": np.asarray(version_names),
+            "endpoint": np.asarray([endpoint_codes[e] for e in endpoints], dtype=np.uint8),
+            "endpoints": np.asarray(endpoint_names),
+            "latency_ms": np.asarray(latencies, dtype=np.float32),
+            "case_id": np.asarray(case_ids),
+        }
+
+    @staticmethod
+    def _label_columns(rows: List[tuple]) -> Dict[str, np.ndarray]:
+        timestamps, case_ids, labels = zip(*rows)
+        return {
+            "timestamp": np.asarray(timestamps, dtype=np.float64),
+            "case_id": np.asarray(case_ids),
+            "label": np.asarray(labels, dtype=np.int8),
+        }
+
+    def _save(self, kind: str, columns: Dict[str, Any], part: bool) -> _Segment:
+        """Atomically write one segment file; the caller adds it to the index."""
+        ts = columns["timestamp"]
+        first_ms, last_ms = int(ts.min() * 1000), int(np.ceil(ts.max() * 1000))
+        sequence = self._sequence
+        self._sequence += 1
+        suffix = ".part.npz" if part else ".npz"
+        path = self.log_dir / f"{kind}_{first_ms}_{last_ms}_{sequence:06d}{suffix}"
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **columns)
+        tmp_path.replace(path)
+        logger.debug(f"Wrote {kind} segment {path.name} ({ts.shape[0]} rows)")
+        return _Segment(sequence, path, first_ms, last_ms, path.stat().st_size, int(ts.shape[0]), part)
+
+    def _add(self, kind: str, segment: _Segment) -> None:
+        with self._index_lock:
+            self._index[kind].append(segment)
+
+    def compact(self, force: bool = False) -> int:
+        """
+        Roll flushed parts into full segments.
+
+        Parts of one kind are merged once they hold ``max_segment_rows`` rows
+        or the oldest is ``roll_interval`` seconds old.
+
+        Args:
+            force: Merge pending parts regardless of size and age
+
+        Returns:
+            Number of part files merged
+        """
+        now_ms = time.time() * 1000
+        merged = 0
+        with self._flush_lock:
+            for kind in _KINDS:
+                with self._index_lock:
+                    parts = [s for s in self._index[kind] if s.part]
+                if not parts:
+                    continue
+                rows = sum(s.rows for s in parts)
+                due = rows >= self.max_segment_rows or now_ms - parts[0].first_ms >= self.roll_interval * 1000
+                if not (force or due):
+                    continue
+
+                columns = self._merge_audit(parts) if kind == "audit" else self._merge_labels(parts)
+                n = columns["timestamp"].shape[0]
+                segments = [
+                    self._save(kind, {
+                        name: values if name in ("endpoints", "model_versions") else values[i:i + self.max_segment_rows]
+                        for name, values in columns.items()
+                    }, part=False)
+                    for i in range(0, n, self.max_segment_rows)
+                ]
+
+                # Swap parts for the merged segments in one step so readers never see both
+                merged_paths = {s.path for s in parts}
+                with self._index_lock:
+                    self._index[kind] = [s for s in self._index[kind] if s.path not in merged_paths] + segments
+                for segment in parts:
+                    segment.path.unlink(missing_ok=True)
+                merged += len(parts)
+                logger.debug(f"Compacted {len(parts)} {kind} parts into {len(segments)} segment(s)")
+        return merged
+
+    @staticmethod
+    def _merge_audit(parts: List[_Segment]) -> Dict[str, np.ndarray]:
+        columns: Dict[str, List[np.ndarray]] = {name: [] for name in _AUDIT_ROW_COLUMNS}
+        endpoints: List[np.ndarray] = []
+        versions: List[np.ndarray] = []
+        for segment in parts:
+            with np.load(segment.path) as seg:
+                for name in _AUDIT_ROW_COLUMNS:
+                    columns[name].append(seg[name])
+                # Each part has its own code tables, so merge on the names and re-encode
+                endpoints.append(seg["endpoints"][seg["endpoint"]])
+                versions.append(seg["model_versions"][seg["model_version"]])
+
+        merged = {name: np.concatenate(values) for name, values in columns.items()}
+        endpoint_names, endpoint_codes = np.unique(np.concatenate(endpoints), return_inverse=True)
+        version_names, version_codes = np.unique(np.concatenate(versions), return_inverse=True)
+        merged.update(
+            endpoint=endpoint_codes.astype(np.uint8),
+            endpoints=endpoint_names,
+            model_version=version_codes.astype(np.uint16),
+            model_versions=version_names,
+        )
+        return merged
+
+    @staticmethod
+    def _merge_labels(parts: List[_Segment]) -> Dict[str, np.ndarray]:
+        columns: Dict[str, List[np.ndarray]] = {"timestamp": [], "case_id": [], "label": []}
+        for segment in parts:
+            with np.load(segment.path) as seg:
+                for name, values in columns.items():
+                    values.append(seg[name])
+        return {name: np.concatenate(values) for name, values in columns.items()}
+
+    def _apply_retention(self) -> None:
+        if not self.retention_days:
+            return
+        cutoff_ms = (time.time() - self.retention_days * 86400) * 1000
+        with self._index_lock:
+            expired = [s for segments in self._index.values() for s in segments if s.last_ms < cutoff_ms]
+            for kind, segments in self._index.items():
+                self._index[kind] = [s for s in segments if s.last_ms >= cutoff_ms]
+        for segment in expired:
+            segment.path.unlink(missing_ok=True)
+            logger.info(f"Removed expired segment {segment.path.name}")
+
+    def _segments(self, start_ms: float = 0, end_ms: float = float("inf"), kind: str = "audit"):
+        """Yield open ``kind`` segments overlapping the time range, oldest first."""
+        with self._index_lock:
+            segments = list(self._index[kind])
+        for segment in segments:
+            if segment.last_ms < start_ms or segment.first_ms > end_ms:
+                continue
+            try:
+                seg = np.load(segment.path)
+            except FileNotFoundError:
+                # Merged or expired after the index snapshot was taken
+                continue
+            with seg:
+                yield seg
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        model_version: Optional[str] = None,
+        limit: int = 1000,
+        include_features: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Scan flushed segments for records in a time range.
+
+        Args:
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (inclusive)
+            model_version: Only return records scored by this model version
+            limit: Maximum number of records returned
+            include_features: Include the 30 input features per record
+
+        Returns:
+            List of audit records, oldest first
+        """
+        start_ts = start.timestamp() if start else 0.0
+        end_ts = end.timestamp() if end else float("inf")
+        feature_names = settings.FEATURE_NAMES
+        records: List[Dict[str, Any]] = []
+
+        for seg in self._segments(start_ts * 1000, end_ts * 1000):
+            ts = seg["timestamp"]
+            mask = (ts >= start_ts) & (ts <= end_ts)
+            versions = seg["model_versions"]
+            if model_version is not None:
+                matches = np.flatnonzero(versions == model_version)
+                if matches.size == 0:
+                    continue
+                mask &= seg["model_version"] == matches[0]
+            idx = np.flatnonzero(mask)[:limit - len(records)]
+            if idx.size == 0:
+                continue
+
+            endpoints = seg["endpoints"]
+            probs = seg["probability_malignant"][idx]
+            tiers = seg["risk_tier"][idx]
+            version_codes = seg["model_version"][idx]
+            endpoint_codes = seg["endpoint"][idx]
+            latencies = seg["latency_ms"][idx]
+            case_ids = seg["case_id"][idx] if "case_id" in seg.files else None
+            features = seg["features"][idx] if include_features else None
+
+            for j, i in enumerate(idx):
+                record = {
+                    "timestamp": datetime.fromtimestamp(float(ts[i])),
+                    "endpoint": str(endpoints[endpoint_codes[j]]),
+                    "probability_malignant": float(probs[j]),
+                    "risk_category": RISK_TIERS[tiers[j]] if tiers[j] < len(RISK_TIERS) else None,
+                    "model_version": str(versions[version_codes[j]]),
+                    "latency_ms": float(latencies[j]),
+                    "case_id": (str(case_ids[j]) or None) if case_ids is not None else None,
+                }
+                if features is not None:
+                    record["features"] = dict(zip(feature_names, features[j].tolist()))
+                records.append(record)
+
+            if len(records) >= limit:
+                break
+
+        return records
+
+    def scan_cases(self, start: Optional[datetime] = None):
+        """
+        Yield stored predictions that carry a case id, oldest first.
+
+        Args:
+            start: Earliest timestamp to scan
+
+        Yields:
+            Tuples of (case_id, timestamp, probability_malignant, risk_category)
+        """
+        start_ts = start.timestamp() if start else 0.0
+        for seg in self._segments(start_ts * 1000):
+            if "case_id" not in seg.files:
+                continue
+            case_ids = seg["case_id"]
+            ts = seg["timestamp"]
+            idx = np.flatnonzero((case_ids != "") & (ts >= start_ts))
+            probs = seg["probability_malignant"][idx]
+            tiers = seg["risk_tier"][idx]
+            for j, i in enumerate(idx):
+                tier = RISK_TIERS[tiers[j]] if tiers[j] < len(RISK_TIERS) else None
+                yield str(case_ids[i]), float(ts[i]), float(probs[j]), tier
+
+    def scan_labels(self, start: Optional[datetime] = None) -> Iterator[Tuple[str, float, int]]:
+        """
+        Yield stored ground-truth labels, oldest first.
+
+        Args:
+            start: Earliest timestamp to scan
+
+        Yields:
+            Tuples of (case_id, timestamp, label)
+        """
+        start_ts = start.timestamp() if start else 0.0
+        for seg in self._segments(start_ts * 1000, kind="labels"):
+            case_ids = seg["case_id"]
+            ts = seg["timestamp"]
+            labels = seg["label"]
+            for i in np.flatnonzero(ts >= start_ts):
+                yield str(case_ids[i]), float(ts[i]), int(labels[i])
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer counters and on-disk footprint."""
+        with self._index_lock:
+            segments = [s for kind_segments in self._index.values() for s in kind_segments]
+        return {
+            "pending": self.pending(),
+            "written": self.written,
+            "labels_pending": len(self._label_buffer),
+            "labels_written": self.labels_written,
+            "dropped": self.dropped,
+            "segments": sum(not s.part for s in segments),
+            "parts": sum(s.part for s in segments),
+            "bytes_on_disk": sum(s.size for s in segments),
+        }
@@ -0,0 +1,239 @@
+"""
+Cached columnar dataset store for data.csv-style inputs.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+from typing import Dict, Any, Optional, Iterator, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cache layout or parsing rules change
+CACHE_FORMAT_VERSION = 2
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+# Accepted ``diagnosis`` values (case-insensitive)
+_LABEL_VALUES = {"m": 1, "malignant": 1, "1": 1, "b": 0, "benign": 0, "0": 0}
+
+
+def normalize_column(name: str) -> str:
+    """Canonical column key: ``concave points_mean`` and ``concave_points_mean`` both map to the latter."""
+    return re.sub(r"[\s\-]+", "_", name.strip().lower())
+
+
+def parse_label(value: str, line: int) -> int:
+    """
+    Map a ``diagnosis`` cell to 1 (Malignant) or 0 (Benign).
+
+    Raises:
+        ValueError: If the value is not M/B, Malignant/Benign or 1/0
+    """
+    label = _LABEL_VALUES.get(value.strip().lower())
+    if label is None:
+        raise ValueError(f"Unrecognized diagnosis {value!r} on line {line} (expected M/B, Malignant/Benign or 1/0)")
+    return label
+
+
+@dataclass
+class Dataset:
+    """Memory-mapped dataset in ``settings.FEATURE_NAMES`` order."""
+
+    features: np.ndarray
+    labels: Optional[np.ndarray]
+    ids: np.ndarray
+    source: Path
+    source_hash: str
+
+    def __len__(self) -> int:
+        return self.features.shape[0]
+
+    def iter_chunks(self, chunk_size: int = 100_000) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Yield (features, labels) views of at most ``chunk_size`` rows, without copying."""
+        for start in range(0, len(self), chunk_size):
+            stop = start + chunk_size
+            yield self.features[start:stop], None if self.labels is None else self.labels[start:stop]
+
+
+class DatasetStore:
+    """
+    Parse CSVs once into memory-mapped ``.npy`` columns keyed by the source file hash.
+
+    The first load streams the CSV twice (count, then fill) straight into
+    ``.npy`` files opened as memory maps, so datasets larger than RAM never have
+    to fit in memory. Later loads hash the file (or reuse the hash while its
+    size and mtime are unchanged) and map the cached arrays read-only.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize dataset store.
+
+        Args:
+            cache_dir: Directory holding cached datasets (created if missing)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._hash_index_path = self.cache_dir / "source_hashes.json"
+
+    @classmethod
+    def from_settings(cls) -> "DatasetStore":
+        """Build a store in the configured cache directory."""
+        return cls(settings.DATASET_CACHE_DIR)
+
+    def _cache_key(self, source_hash: str) -> str:
+        schema = hashlib.sha256(
+            json.dumps([CACHE_FORMAT_VERSION, settings.FEATURE_NAMES]).encode()
+        ).hexdigest()[:8]
+        return f"{source_hash[:32]}_{schema}"
+
+    def _source_hash(self, path: Path) -> str:
+        """SHA-256 of the file, reused while its size and mtime are unchanged."""
+        stat = path.stat()
+        index = {}
+        if self._hash_index_path.exists():
+            try:
+                index = json.loads(self._hash_index_path.read_text())
+            except (OSError, ValueError):
+                index = {}
+        key = str(path.resolve())
+        entry = index.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(block)
+        source_hash = digest.hexdigest()
+
+        index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": source_hash}
+        tmp_path = self._hash_index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index))
+        tmp_path.replace(self._hash_index_path)
+        return source_hash
+
+    def load(self, csv_path: Path) -> Dataset:
+        """
+        Load a CSV as memory-mapped arrays, parsing it only if it is not cached yet.
+
+        Args:
+            csv_path: data.csv-style file with the 30 feature columns and
+                optional ``id`` and ``diagnosis`` columns
+
+        Returns:
+            Dataset with read-only memory-mapped arrays
+
+        Raises:
+            ValueError: If feature columns are missing or a diagnosis is not recognized
+        """
+        csv_path = Path(csv_path)
+        source_hash = self._source_hash(csv_path)
+        entry_dir = self.cache_dir / self._cache_key(source_hash)
+
+        if not (entry_dir / "meta.json").exists():
+            self._build(csv_path, entry_dir)
+        else:
+            logger.debug(f"Dataset cache hit for {csv_path}")
+
+        meta = json.loads((entry_dir / "meta.json").read_text())
+        labels_path = entry_dir / "labels.npy"
+        return Dataset(
+            features=np.load(entry_dir / "features.npy", mmap_mode="r"),
+            labels=np.load(labels_path, mmap_mode="r") if meta["has_labels"] else None,
+            ids=np.load(entry_dir / "ids.npy", mmap_mode="r"),
+            source=csv_path,
+            source_hash=source_hash,
+        )
+
+    def _resolve_columns(self, header) -> Dict[str, Any]:
+        positions = {normalize_column(name): i for i, name in enumerate(header) if name.strip()}
+        missing = [name for name in settings.FEATURE_NAMES if normalize_column(name) not in positions]
+        if missing:
+            raise ValueError(f"CSV is missing feature columns: {missing}")
+        return {
+            "features": [positions[normalize_column(name)] for name in settings.FEATURE_NAMES],
+            "label": positions.get("diagnosis"),
+            "id": positions.get("id"),
+        }
+
+    def _build(self, csv_path: Path, entry_dir: Path) -> None:
+        logger.info(f"Parsing {csv_path} into dataset cache {entry_dir.name}")
+
+        # Pass 1: header, row count and id width
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            columns = self._resolve_columns(next(reader))
+            n_rows = 0
+            id_width = 1
+            numeric_ids = True
+            for row in reader:
+                if not row:
+                    continue
+                n_rows += 1
+                if columns["id"] is not None:
+                    value = row[columns["id"]].strip()
+                    id_width = max(id_width, len(value))
+                    if numeric_ids and not value.lstrip("-").isdigit():
+                        numeric_ids = False
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".build_", dir=self.cache_dir))
+        try:
+            features = np.lib.format.open_memmap(
+                tmp_dir / "features.npy", mode="w+", dtype=np.float64,
+                shape=(n_rows, len(settings.FEATURE_NAMES))
+            )
+            labels = None
+            if columns["label"] is not None:
+                labels = np.lib.format.open_memmap(tmp_dir / "labels.npy", mode="w+", dtype=np.int8, shape=(n_rows,))
+            id_dtype = np.int64 if numeric_ids else f"<U{id_width}"
+            ids = np.lib.format.open_memmap(tmp_dir / "ids.npy", mode="w+", dtype=id_dtype, shape=(n_rows,))
+
+            # Pass 2: fill the memory maps row by row
+            feature_cols = columns["features"]
+            with open(csv_path, newline="") as f:
+                reader = csv.reader(f)
+                next(reader)
+                i = 0
+                for row in reader:
+                    if not row:
+                        continue
+                    features[i] = [float(row[c]) for c in feature_cols]
+                    if labels is not None:
+                        labels[i] = parse_label(row[columns["label"]], reader.line_num)
+                    ids[i] = row[columns["id"]].strip() if columns["id"] is not None else i
+                    i += 1
+
+            for array in (features, labels, ids):
+                if array is not None:
+                    array.flush()
+            del features, labels, ids
+
+            (tmp_dir / "meta.json").write_text(json.dumps({
+                "source": str(csv_path),
+                "rows": n_rows,
+                "feature_names": settings.FEATURE_NAMES,
+                "has_labels": columns["label"] is not None,
+                "format_version": CACHE_FORMAT_VERSION,
+            }))
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                # Another process built the same entry first
+                if not (entry_dir / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Cached {n_rows} rows from {csv_path}")
@@ -0,0 +1,295 @@
+"""
+Streaming input-drift monitor for live predictions.
+"""
+
+import math
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Floor applied to bin proportions so PSI stays finite for empty bins
+_PSI_EPSILON = 1e-4
+
+
+def _normal_bin_proportions(edges: np.ndarray) -> np.ndarray:
+    """Expected bin proportions of a standard normal for the given interior edges."""
+    cdf = np.array([0.5 * (1.0 + math.erf(e / math.sqrt(2.0))) for e in edges])
+    return np.diff(np.concatenate(([0.0], cdf, [1.0])))
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """
+    Population stability index between binned distributions.
+
+    Args:
+        expected: Reference bin proportions (..., n_bins)
+        actual: Observed bin proportions (..., n_bins)
+
+    Returns:
+        PSI per leading index (sum over the last axis)
+    """
+    e = np.clip(expected, _PSI_EPSILON, None)
+    a = np.clip(actual, _PSI_EPSILON, None)
+    return np.sum((a - e) * np.log(a / e), axis=-1)
+
+
+class DriftMonitor:
+    """
+    Constant-memory drift monitor comparing live inputs against the training baseline.
+
+    Inputs are standardized with the scaler's training ``mean_``/``var_`` and
+    accumulated into fixed-bin histograms plus first/second moments. The sliding
+    window is a ring of ``n_buckets`` sub-windows, so memory is fixed regardless
+    of traffic and each update is a handful of vectorized numpy operations.
+
+    Baselines are normally set from the training data via ``set_reference``
+    (empirical feature histograms and the training probability distribution).
+    Without a reference sample, feature baselines fall back to a normal
+    approximation of the scaler statistics, which overstates PSI for skewed
+    features, and the probability baseline is frozen from the first full window
+    of traffic.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        var: np.ndarray,
+        feature_names: List[str],
+        window_size: int = 1000,
+        n_buckets: int = 10,
+        n_bins: int = 10,
+        n_probability_bins: int = 10,
+    ):
+        """
+        Initialize drift monitor.
+
+        Args:
+            mean: Training feature means (n_features,)
+            var: Training feature variances (n_features,)
+            feature_names: Names matching the feature order
+            window_size: Number of most recent rows in the sliding window
+            n_buckets: Number of sub-windows the sliding window is split into
+            n_bins: Histogram bins per feature (including both open tails)
+            n_probability_bins: Histogram bins for the malignancy probability
+        """
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.mean = np.asarray(mean, dtype=np.float64).ravel()
+        self.std = np.sqrt(np.asarray(var, dtype=np.float64).ravel())
+        self.std[self.std == 0] = 1.0
+
+        if self.mean.shape[0] != self.n_features:
+            raise ValueError(
+                f"Baseline has {self.mean.shape[0]} features, expected {self.n_features}"
+            )
+
+        self.n_buckets = max(1, int(n_buckets))
+        self.bucket_size = max(1, int(window_size) // self.n_buckets)
+        self.window_size = self.bucket_size * self.n_buckets
+
+        # Bins are fixed in standardized space: open tails beyond +/-3 sigma
+        self.n_bins = max(3, int(n_bins))
+        self.edges = np.linspace(-3.0, 3.0, self.n_bins - 1)
+        self._bin_offsets = (np.arange(self.n_features) * self.n_bins)[np.newaxis, :]
+        self.reference_proportions = np.tile(
+            _normal_bin_proportions(self.edges), (self.n_features, 1)
+        )
+
+        self.n_probability_bins = max(2, int(n_probability_bins))
+        self.probability_edges = np.linspace(0.0, 1.0, self.n_probability_bins + 1)[1:-1]
+        self.probability_reference: Optional[Dict[str, Any]] = None
+
+        # Ring of sub-window accumulators
+        nb = self.n_buckets
+        self._rows = np.zeros(nb, dtype=np.int64)
+        self._counts = np.zeros((nb, self.n_features, self.n_bins), dtype=np.int64)
+        self._sum = np.zeros((nb, self.n_features))
+        self._sumsq = np.zeros((nb, self.n_features))
+        self._prob_counts = np.zeros((nb, self.n_probability_bins), dtype=np.int64)
+        self._prob_sum = np.zeros(nb)
+        self._prob_sumsq = np.zeros(nb)
+        self._current = 0
+        self.total_rows = 0
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scaler(cls, scaler, feature_names: List[str]) -> "DriftMonitor":
+        """Build a monitor from a fitted StandardScaler and the configured window settings."""
+        return cls(
+            mean=scaler.mean_,
+            var=scaler.var_,
+            feature_names=feature_names,
+            window_size=settings.DRIFT_WINDOW_SIZE,
+            n_buckets=settings.DRIFT_WINDOW_BUCKETS,
+            n_bins=settings.DRIFT_HISTOGRAM_BINS,
+        )
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        return (np.asarray(features, dtype=np.float64).reshape(-1, self.n_features) - self.mean) / self.std
+
+    def _probability_histogram(self, probabilities: np.ndarray) -> np.ndarray:
+        idx = np.searchsorted(self.probability_edges, probabilities, side="right")
+        return np.bincount(idx, minlength=self.n_probability_bins)
+
+    def set_reference(self, features: np.ndarray, probabilities: Optional[np.ndarray] = None) -> None:
+        """
+        Replace the normal-approximation baseline with an empirical reference sample.
+
+        Args:
+            features: Reference feature matrix (n_samples, n_features), e.g. training data
+            probabilities: Optional reference malignancy probabilities (n_samples,)
+        """
+        z = self._standardize(features)
+        idx = np.searchsorted(self.edges, z, side="right") + self._bin_offsets
+        counts = np.bincount(idx.ravel(), minlength=self.n_features * self.n_bins)
+        counts = counts.reshape(self.n_features, self.n_bins)
+        with self._lock:
+            self.reference_proportions = counts / max(1, z.shape[0])
+            if probabilities is not None:
+                self._freeze_probability_reference(
+                    self._probability_histogram(np.asarray(probabilities, dtype=np.float64).ravel()),
+                    float(np.sum(probabilities)),
+                    float(np.sum(np.square(probabilities))),
+                    int(np.size(probabilities)),
+                )
+        logger.info(f"Drift reference set from {z.shape[0]} samples")
+
+    def _freeze_probability_reference(self, counts: np.ndarray, total: float, total_sq: float, n: int) -> None:
+        mean = total / n
+        var = max(total_sq / n - mean * mean, 0.0)
+        self.probability_reference = {
+            "proportions": counts / n,
+            "mean": mean,
+            "std": math.sqrt(var) or 1.0,
+        }
+
+    def update(self, features: np.ndarray, probabilities: np.ndarray) -> None:
+        """
+        Record scored rows.
+
+        Args:
+            features: Raw input features (n_samples, n_features)
+            probabilities: Malignancy probabilities (n_samples,)
+        """
+        z = self._standardize(features)
+        probs = np.asarray(probabilities, dtype=np.float64).ravel()
+        n = z.shape[0]
+        if n == 0:
+            return
+
+        bins = np.searchsorted(self.edges, z, side="right") + self._bin_offsets
+        prob_bins = np.searchsorted(self.probability_edges, probs, side="right")
+
+        with self._lock:
+            start = 0
+            while start < n:
+                if self._rows[self._current] >= self.bucket_size:
+                    self._advance()
+                take = min(n - start, self.bucket_size - int(self._rows[self._current]))
+                self._accumulate(z[start:start + take], bins[start:start + take],
+                                 probs[start:start + take], prob_bins[start:start + take])
+                start += take
+            self.total_rows += n
+
+    def _accumulate(self, z: np.ndarray, bins: np.ndarray, probs: np.ndarray, prob_bins: np.ndarray) -> None:
+        b = self._current
+        self._rows[b] += z.shape[0]
+        self._counts[b] += np.bincount(
+            bins.ravel(), minlength=self.n_features * self.n_bins
+        ).reshape(self.n_features, self.n_bins)
+        self._sum[b] += z.sum(axis=0)
+        self._sumsq[b] += np.square(z).sum(axis=0)
+        self._prob_counts[b] += np.bincount(prob_bins, minlength=self.n_probability_bins)
+        self._prob_sum[b] += probs.sum()
+        self._prob_sumsq[b] += np.square(probs).sum()
+
+    def _advance(self) -> None:
+        """Rotate to the next sub-window, freezing the probability baseline on the first full window."""
+        if self.probability_reference is None and self._rows.sum() >= self.window_size:
+            self._freeze_probability_reference(
+                self._prob_counts.sum(axis=0),
+                float(self._prob_sum.sum()),
+                float(self._prob_sumsq.sum()),
+                int(self._rows.sum()),
+            )
+            logger.info("Drift probability baseline frozen from first full window")
+
+        self._current = (self._current + 1) % self.n_buckets
+        b = self._current
+        self._rows[b] = 0
+        self._counts[b] = 0
+        self._sum[b] = 0.0
+        self._sumsq[b] = 0.0
+        self._prob_counts[b] = 0
+        self._prob_sum[b] = 0.0
+        self._prob_sumsq[b] = 0.0
+
+    def report(self, psi_alert: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize drift over the current sliding window.
+
+        Args:
+            psi_alert: PSI above which a feature is flagged (defaults to settings)
+
+        Returns:
+            Dictionary with per-feature and probability PSI and standardized shift
+        """
+        if psi_alert is None:
+            psi_alert = settings.DRIFT_PSI_ALERT
+
+        with self._lock:
+            n = int(self._rows.sum())
+            counts = self._counts.sum(axis=0)
+            z_sum = self._sum.sum(axis=0)
+            z_sumsq = self._sumsq.sum(axis=0)
+            prob_counts = self._prob_counts.sum(axis=0)
+            prob_sum = float(self._prob_sum.sum())
+            reference = self.reference_proportions
+            prob_reference = self.probability_reference
+            total_rows = self.total_rows
+
+        result: Dict[str, Any] = {
+            "window_rows": n,
+            "window_size": self.window_size,
+            "total_rows": total_rows,
+            "psi_alert_threshold": psi_alert,
+            "features": {},
+            "probability": None,
+            "drifted_features": [],
+        }
+        if n == 0:
+            return result
+
+        z_mean = z_sum / n
+        z_std = np.sqrt(np.maximum(z_sumsq / n - z_mean ** 2, 0.0))
+        psi = population_stability_index(reference, counts / n)
+
+        for i, name in enumerate(self.feature_names):
+            result["features"][name] = {
+                "psi": float(psi[i]),
+                "standardized_shift": float(z_mean[i]),
+                "variance_ratio": float(z_std[i] ** 2),
+                "window_mean": float(self.mean[i] + z_mean[i] * self.std[i]),
+                "baseline_mean": float(self.mean[i]),
+            }
+        result["drifted_features"] = [
+            name for i, name in enumerate(self.feature_names) if psi[i] > psi_alert
+        ]
+
+        prob_mean = prob_sum / n
+        probability = {"window_mean": prob_mean, "psi": None, "standardized_shift": None, "baseline_mean": None}
+        if prob_reference is not None:
+            probability["psi"] = float(population_stability_index(
+                prob_reference["proportions"], prob_counts / n
+            ))
+            probability["standardized_shift"] = (prob_mean - prob_reference["mean"]) / prob_reference["std"]
+            probability["baseline_mean"] = prob_reference["mean"]
+        result["probability"] = probability
+
+        return result
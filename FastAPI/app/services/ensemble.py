@@ -0,0 +1,130 @@
+"""
+Bootstrap ensemble training for per-prediction uncertainty.
+
+Usage (from the FastAPI directory):
+    python -m app.services.ensemble --data ../data.csv --models-dir ../saved_models --n-models 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from typing import List, Tuple
+import logging
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+from app.services.ml_service import MLService, fold_scaler
+
+logger = logging.getLogger(__name__)
+
+
+def _fit_members(estimator, features: np.ndarray, labels: np.ndarray, seed: int,
+                 n_models: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Refit ``n_models`` clones of ``estimator`` on bootstrap resamples."""
+    rng = np.random.default_rng(seed)
+    n = features.shape[0]
+    coefs: List[np.ndarray] = []
+    intercepts: List[float] = []
+    while len(coefs) < n_models:
+        index = rng.integers(0, n, size=n)
+        if np.unique(labels[index]).size < 2:
+            continue
+        member = clone(estimator).fit(features[index], labels[index])
+        coefs.append(np.ravel(member.coef_))
+        intercepts.append(float(np.ravel(member.intercept_)[0]))
+    return np.array(coefs), np.array(intercepts)
+
+
+def fit_bootstrap_ensemble(ml_service: MLService, features: np.ndarray, labels: np.ndarray,
+                           n_models: int = 100, seed: int = 42, chunk_size: int = 10,
+                           n_jobs: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Refit the served logistic model on bootstrap resamples of a labeled dataset.
+
+    Members reuse the served model's hyperparameters and its fitted scaler, so the
+    spread of their predictions reflects sampling variability of the coefficients.
+    Each member's weights are folded onto raw features and stacked into one matrix.
+
+    Args:
+        ml_service: Loaded ML service for the served (linear) model
+        features: Raw feature matrix (n_samples, 30)
+        labels: Binary labels (1 = Malignant)
+        n_models: Number of ensemble members
+        seed: Random seed for the resamples
+        chunk_size: Members fitted per parallel task
+        n_jobs: Parallel workers (joblib)
+
+    Returns:
+        Tuple of (weights (n_models, 30), intercepts (n_models,)) on raw features
+    """
+    if not hasattr(ml_service.model, "coef_"):
+        raise ValueError(f"{type(ml_service.model).__name__} is not a linear model")
+
+    scaled = ml_service.preprocess_features(np.asarray(features, dtype=np.float64))
+    labels = np.asarray(labels)
+
+    sizes = [min(chunk_size, n_models - start) for start in range(0, n_models, chunk_size)]
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+    tasks = (delayed(_fit_members)(ml_service.model, scaled, labels, s, size) for s, size in zip(seeds, sizes))
+    chunks = Parallel(n_jobs=n_jobs)(tasks)
+
+    coefs = np.concatenate([c for c, _ in chunks])
+    intercepts = np.concatenate([b for _, b in chunks])
+    folded = fold_scaler(coefs, intercepts, ml_service.scaler)
+    if folded is None:
+        raise ValueError(f"Cannot fold {type(ml_service.scaler).__name__} into the ensemble weights")
+    return folded
+
+
+def save_ensemble(path: Path, weights: np.ndarray, intercepts: np.ndarray, **metadata) -> None:
+    """Write an ensemble file atomically (``weights``, ``intercepts`` and scalar metadata)."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, weights=weights, intercepts=intercepts, **metadata)
+    tmp_path.replace(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train a bootstrap ensemble for prediction uncertainty")
+    parser.add_argument("--data", type=Path, default=Path(__file__).parents[3] / "data.csv",
+                        help="Labeled training CSV (id, diagnosis, 30 feature columns)")
+    parser.add_argument("--models-dir", type=Path, default=settings.MODELS_DIR,
+                        help="Directory containing saved model artifacts")
+    parser.add_argument("--model", default=settings.MODEL_ID,
+                        help="Model id (artifact timestamp or 'latest')")
+    parser.add_argument("--n-models", type=int, default=100, help="Number of bootstrap refits")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Parallel workers (-1 for all cores)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    ml_service = MLService(models_dir=args.models_dir, model_id=args.model)
+    ml_service.load_models()
+    dataset = DatasetStore.from_settings().load(args.data)
+    if dataset.labels is None:
+        parser.error(f"{args.data} has no 'diagnosis' column")
+
+    start_time = time.time()
+    weights, intercepts = fit_bootstrap_ensemble(
+        ml_service, dataset.features, dataset.labels,
+        n_models=args.n_models, seed=args.seed, n_jobs=args.n_jobs
+    )
+    output = args.models_dir / f"ensemble_{args.model}.npz"
+    save_ensemble(
+        output, weights, intercepts,
+        seed=args.seed, source_hash=dataset.source_hash, model_fingerprint=ml_service.model_fingerprint
+    )
+
+    print(f"Trained {weights.shape[0]} models on {len(dataset)} rows in {time.time() - start_time:.1f}s")
+    print(f"Ensemble written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Vectorized model evaluation with bootstrap confidence intervals.
+
+Usage (from the FastAPI directory):
+    python -m app.services.evaluation --data ../test/test_data.csv --models-dir ../saved_models \
+        --model latest --n-bootstrap 10000 --n-jobs 4 --output report.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from joblib import Parallel, delayed
+from typing import Dict, Any, List, Optional
+import logging
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+from app.services.ml_service import MLService, RISK_TIERS
+
+logger = logging.getLogger(__name__)
+
+METRICS = ["roc_auc", "sensitivity", "specificity", "accuracy"]
+
+_METADATA_PATTERN = re.compile(r"^model_metadata_(.+)\.pkl$")
+
+# Memory budget for one bootstrap chunk (per joblib worker) and the approximate
+# bytes held per (resample, row) cell: index matrix, counts and float64 weight copies
+_CHUNK_MEMORY_BYTES = 256 * 1024 * 1024
+_BYTES_PER_CELL = 48
+
+
+def list_models(models_dir: Path) -> List[str]:
+    """
+    Model ids registered in a models directory.
+
+    A model id is the artifact suffix shared by ``best_model_*<id>.pkl`` and
+    ``model_metadata_<id>.pkl`` (a timestamp or ``latest``).
+    """
+    models_dir = Path(models_dir)
+    ids = []
+    for path in sorted(models_dir.glob("model_metadata_*.pkl")):
+        match = _METADATA_PATTERN.match(path.name)
+        if match is None:
+            continue
+        model_id = match.group(1)
+        if any(models_dir.glob(f"best_model_*{model_id}.pkl")):
+            ids.append(model_id)
+    return ids
+
+
+def _resample_counts(index_matrix: np.ndarray, n: int) -> np.ndarray:
+    """Convert a (B, n) bootstrap index matrix into per-resample row multiplicities (B, n)."""
+    b = index_matrix.shape[0]
+    flat = index_matrix + (np.arange(b) * n)[:, np.newaxis]
+    return np.bincount(flat.ravel(), minlength=b * n).reshape(b, n)
+
+
+def _auc_from_weights(weights: np.ndarray, scores: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    ROC-AUC for each row of sample weights (Mann-Whitney with ties counted as 1/2).
+
+    Args:
+        weights: Row multiplicities (B, n); a single unit row gives the plain AUC
+        scores: Predicted probabilities (n,)
+        labels: Binary labels (n,)
+
+    Returns:
+        AUC per row (B,), NaN where a class is absent
+    """
+    if scores.shape[0] == 0:
+        return np.full(weights.shape[0], np.nan)
+
+    order = np.argsort(scores, kind="stable")
+    sorted_scores = scores[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+
+    w = weights[:, order].astype(np.float64)
+    is_pos = labels[order].astype(bool)
+    pos = np.add.reduceat(np.where(is_pos, w, 0.0), group_starts, axis=1)
+    neg = np.add.reduceat(np.where(is_pos, 0.0, w), group_starts, axis=1)
+
+    neg_below = np.cumsum(neg, axis=1) - neg
+    numerator = np.sum(pos * (neg_below + 0.5 * neg), axis=1)
+    denominator = pos.sum(axis=1) * neg.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _metrics_from_weights(weights: np.ndarray, scores: np.ndarray, labels: np.ndarray,
+                          predicted: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Confusion counts and rates for each row of sample weights, as matrix-vector products.
+
+    An empty group (e.g. a risk tier no case fell into) gives zero counts and NaN rates.
+    """
+    y = labels.astype(bool)
+    weights = weights.astype(np.float64)
+    tp = weights @ (y & predicted)
+    fn = weights @ (y & ~predicted)
+    tn = weights @ (~y & ~predicted)
+    fp = weights @ (~y & predicted)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "true_positives": tp,
+            "false_negatives": fn,
+            "true_negatives": tn,
+            "false_positives": fp,
+            "sensitivity": tp / (tp + fn),
+            "specificity": tn / (tn + fp),
+            "accuracy": (tp + tn) / (tp + tn + fp + fn),
+            "roc_auc": _auc_from_weights(weights, scores, labels),
+        }
+
+
+def _evaluate_groups(weights: np.ndarray, scores: np.ndarray, labels: np.ndarray,
+                     predicted: np.ndarray, tiers: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+    """Metrics overall and per risk tier for every row of sample weights."""
+    groups = {"overall": _metrics_from_weights(weights, scores, labels, predicted)}
+    for tier in RISK_TIERS:
+        mask = tiers == tier
+        groups[tier] = _metrics_from_weights(
+            weights[:, mask], scores[mask], labels[mask], predicted[mask]
+        )
+    return groups
+
+
+def _bootstrap_chunk(seed: int, n_resamples: int, scores: np.ndarray, labels: np.ndarray,
+                     predicted: np.ndarray, tiers: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+    """Draw one index matrix of resamples and evaluate all of them at once."""
+    rng = np.random.default_rng(seed)
+    n = scores.shape[0]
+    index_matrix = rng.integers(0, n, size=(n_resamples, n))
+    weights = _resample_counts(index_matrix, n)
+    groups = _evaluate_groups(weights, scores, labels, predicted, tiers)
+    return {group: {m: values[m] for m in METRICS} for group, values in groups.items()}
+
+
+def default_chunk_size(n_samples: int, n_bootstrap: int) -> int:
+    """Resamples per chunk that keep one chunk's (chunk, n) matrices within the memory budget."""
+    return max(1, min(n_bootstrap, _CHUNK_MEMORY_BYTES // (max(n_samples, 1) * _BYTES_PER_CELL)))
+
+
+def bootstrap_metrics(scores: np.ndarray, labels: np.ndarray, predicted: np.ndarray,
+                      tiers: np.ndarray, n_bootstrap: int = 10000, seed: int = 42,
+                      chunk_size: Optional[int] = None, n_jobs: int = 1) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Bootstrap distributions of every metric, overall and per risk tier.
+
+    Resamples are drawn in chunks of ``chunk_size`` index rows to bound memory;
+    chunks run in parallel with joblib when ``n_jobs`` != 1, and each worker
+    holds one chunk at a time.
+
+    Args:
+        chunk_size: Resamples per chunk (None sizes chunks from the number of rows)
+
+    Returns:
+        {group: {metric: array of n_bootstrap values}}
+    """
+    if chunk_size is None:
+        chunk_size = default_chunk_size(scores.shape[0], n_bootstrap)
+    sizes = [min(chunk_size, n_bootstrap - start) for start in range(0, n_bootstrap, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(int(s.generate_state(1)[0]), size, scores, labels, predicted, tiers) for s, size in zip(seeds, sizes)]
+
+    if n_jobs == 1:
+        chunks = [_bootstrap_chunk(*a) for a in args]
+    else:
+        chunks = Parallel(n_jobs=n_jobs)(delayed(_bootstrap_chunk)(*a) for a in args)
+
+    return {
+        group: {m: np.concatenate([c[group][m] for c in chunks]) for m in METRICS}
+        for group in chunks[0]
+    }
+
+
+def evaluate_model(ml_service: MLService, features: np.ndarray, labels: np.ndarray,
+                   n_bootstrap: int = 10000, confidence: float = 0.95, seed: int = 42,
+                   n_jobs: int = 1, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Score a labeled dataset in one pass and report metrics with bootstrap CIs.
+
+    Args:
+        ml_service: Loaded ML service for the model under evaluation
+        features: Raw feature matrix (n_samples, 30)
+        labels: Binary labels (1 = Malignant)
+        n_bootstrap: Number of bootstrap resamples (0 disables CIs)
+        confidence: Two-sided percentile interval level
+        seed: Random seed for the resample index matrix
+        n_jobs: Parallel workers for bootstrap chunks
+        chunk_size: Resamples per bootstrap chunk (None sizes chunks from the number of rows)
+
+    Returns:
+        Report with point estimates and CIs overall and per risk tier
+    """
+    start_time = time.time()
+    scores = ml_service.predict_proba_batch(features)
+    predicted = scores > 0.5
+    tiers = ml_service.stratify_risk_batch(scores)
+
+    unit = np.ones((1, scores.shape[0]))
+    point = _evaluate_groups(unit, scores, labels, predicted, tiers)
+
+    intervals = None
+    if n_bootstrap > 0:
+        samples = bootstrap_metrics(scores, labels, predicted, tiers,
+                                    n_bootstrap=n_bootstrap, seed=seed, chunk_size=chunk_size,
+                                    n_jobs=n_jobs)
+        alpha = (1.0 - confidence) / 2
+        intervals = {
+            group: {
+                m: [float(v) for v in np.nanquantile(values[m], [alpha, 1 - alpha])]
+                if not np.all(np.isnan(values[m])) else None
+                for m in METRICS
+            }
+            for group, values in samples.items()
+        }
+
+    def _value(v):
+        v = float(v[0])
+        return None if np.isnan(v) else v
+
+    groups = {}
+    for group, metrics in point.items():
+        mask = np.ones_like(predicted) if group == "overall" else tiers == group
+        groups[group] = {
+            "n": int(mask.sum()),
+            "malignant": int(labels[mask].sum()),
+            "confusion_matrix": {
+                k: int(metrics[k][0])
+                for k in ("true_positives", "false_positives", "true_negatives", "false_negatives")
+            },
+            **{m: _value(metrics[m]) for m in METRICS},
+            "confidence_intervals": intervals[group] if intervals else None,
+        }
+
+    return {
+        "model_id": ml_service.model_id,
+        "model_version": ml_service.model_metadata.get("model_name", "Unknown"),
+        "n_samples": int(scores.shape[0]),
+        "n_bootstrap": n_bootstrap,
+        "confidence": confidence,
+        "thresholds": {"low": settings.LOW_RISK_THRESHOLD, "high": settings.HIGH_RISK_THRESHOLD},
+        "overall": groups.pop("overall"),
+        "by_risk_tier": groups,
+        "evaluation_time": time.time() - start_time,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluate a registered model on a labeled CSV")
+    parser.add_argument("--data", type=Path, help="Labeled CSV (id, diagnosis, 30 feature columns)")
+    parser.add_argument("--models-dir", type=Path, default=settings.MODELS_DIR,
+                        help="Directory containing saved model artifacts")
+    parser.add_argument("--model", default=settings.MODEL_ID,
+                        help="Model id (artifact timestamp or 'latest')")
+    parser.add_argument("--list-models", action="store_true", help="List registered model ids and exit")
+    parser.add_argument("--n-bootstrap", type=int, default=10000, help="Bootstrap resamples (0 disables CIs)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence interval level")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Parallel workers for bootstrap (-1 for all cores)")
+    parser.add_argument("--chunk-size", type=int,
+                        help="Bootstrap resamples per chunk (default: sized from the number of rows)")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.list_models:
+        for model_id in list_models(args.models_dir):
+            print(model_id)
+        return 0
+    if args.data is None:
+        parser.error("--data is required")
+
+    ml_service = MLService(models_dir=args.models_dir, model_id=args.model)
+    ml_service.load_models()
+    dataset = DatasetStore.from_settings().load(args.data)
+    if dataset.labels is None:
+        parser.error(f"{args.data} has no 'diagnosis' column")
+    features, labels = dataset.features, dataset.labels
+
+    report = evaluate_model(ml_service, features, labels, n_bootstrap=args.n_bootstrap,
+                            confidence=args.confidence, seed=args.seed, n_jobs=args.n_jobs,
+                            chunk_size=args.chunk_size)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+        logger.warning(f"Report written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,17 +2,78 @@
 Machine Learning service for model loading and predictions.
 """
 
+import hashlib
 import pickle
 import joblib
 import numpy as np
+from sklearn.preprocessing import StandardScaler
+from statistics import NormalDist
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 import logging
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Risk categories in increasing order of malignancy probability
+RISK_TIERS = ["Low", "Medium", "High"]
+
+
+def fold_scaler(coef: np.ndarray, intercept, scaler) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Fold a StandardScaler into linear model weights so they apply to raw features.
+    
+    ``((x - mean) / scale) @ coef + b`` equals ``x @ (coef / scale) + b'``. Works for a
+    single coefficient vector (30,) or a stack of them (k, 30).
+    
+    Args:
+        coef: Coefficients on standardized features, (30,) or (k, 30)
+        intercept: Intercept scalar or (k,) intercepts
+        scaler: Fitted scaler, or None when the model was trained on raw features
+        
+    Returns:
+        (weights, intercept) on raw features, or None if the scaler cannot be folded
+    """
+    weights = np.asarray(coef, dtype=np.float64)
+    intercept = np.asarray(intercept, dtype=np.float64)
+    if scaler is None:
+        return weights, intercept
+    # Only a StandardScaler can be folded; other scalers use the estimator fallback
+    if not isinstance(scaler, StandardScaler):
+        return None
+    if scaler.with_std:
+        weights = weights / np.asarray(scaler.scale_, dtype=np.float64)
+    if scaler.with_mean:
+        intercept = intercept - weights @ np.asarray(scaler.mean_, dtype=np.float64)
+    return weights, intercept
+
+
+def linear_fingerprint(coef: np.ndarray, intercept, scaler) -> str:
+    """
+    SHA-256 of a linear model's coefficients, intercept and scaler statistics.
+    
+    Identifies the served model an ensemble was trained against, so member
+    weights are never stacked behind a different model or scaler.
+    
+    Args:
+        coef: Model coefficients on standardized features
+        intercept: Model intercept(s)
+        scaler: Fitted scaler, or None when the model was trained on raw features
+        
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for values in (coef, intercept):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    for attr in ("mean_", "scale_"):
+        values = getattr(scaler, attr, None)
+        if values is not None:
+            digest.update(attr.encode())
+            digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
 
 class MLService:
     """
@@ -20,18 +81,29 @@ class MLService:
     Handles model loading, preprocessing, and inference.
     """
     
-    def __init__(self, models_dir: Path):
+    def __init__(self, models_dir: Path, model_id: Optional[str] = None):
         """
         Initialize ML service.
         
         Args:
             models_dir: Directory containing saved model artifacts
+            model_id: Artifact timestamp (e.g. "20251213_184350") or "latest";
+                defaults to settings.MODEL_ID
         """
         self.models_dir = Path(models_dir)
+        self.model_id = model_id or settings.MODEL_ID
         self.model = None
         self.scaler = None
         self.feature_names = None
         self.model_metadata = {}
+        self.coef_ = None
+        # dtype -> (weights, intercept) with the scaler folded in, for vectorized scoring
+        self._linear_params: Dict[np.dtype, Tuple[np.ndarray, Any]] = {}
+        # linear_fingerprint of the served model, checked against the ensemble file
+        self.model_fingerprint: Optional[str] = None
+        # dtype -> (weights (30, 1 + k), intercepts (1 + k,)): served model then ensemble members
+        self._ensemble: Dict[np.dtype, Tuple[np.ndarray, np.ndarray]] = {}
+        self.ensemble_size = 0
         
         logger.info(f"Initialized MLService with models directory: {self.models_dir}")
     
@@ -45,15 +117,16 @@ class MLService:
         """
         try:
             # Load main model using joblib (as the notebook uses joblib)
-            model_path = self.models_dir / "best_model_logistic_regression_20251213_184350.pkl"
-            if not model_path.exists():
-                raise FileNotFoundError(f"Model not found at {model_path}")
+            model_paths = sorted(self.models_dir.glob(f"best_model_*{self.model_id}.pkl"))
+            if not model_paths:
+                raise FileNotFoundError(f"Model '{self.model_id}' not found in {self.models_dir}")
+            model_path = model_paths[0]
             
             self.model = joblib.load(model_path)
             logger.info(f"✅ Loaded model: {type(self.model).__name__}")
             
             # Load scaler
-            scaler_path = self.models_dir / "scaler_20251213_184350.pkl"
+            scaler_path = self.models_dir / f"scaler_{self.model_id}.pkl"
             if scaler_path.exists():
                 self.scaler = joblib.load(scaler_path)
                 logger.info(f"✅ Loaded scaler: {type(self.scaler).__name__}")
@@ -70,7 +143,7 @@ class MLService:
                 logger.warning("⚠️ Using default feature names from config")
             
             # Load metadata if available
-            metadata_path = self.models_dir / "model_metadata_20251213_184350.pkl"
+            metadata_path = self.models_dir / f"model_metadata_{self.model_id}.pkl"
             if metadata_path.exists():
                 self.model_metadata = joblib.load(metadata_path)
                 # Extract feature names from metadata if available
@@ -92,6 +165,9 @@ class MLService:
             except Exception:
                 self.coef_ = None
             
+            self._prepare_linear_params()
+            self._load_ensemble()
+            
         except Exception as e:
             logger.error(f"❌ Failed to load models: {str(e)}")
             raise
@@ -119,6 +195,154 @@ class MLService:
         
         logger.info("✅ Model validation passed")
     
+    def _prepare_linear_params(self) -> None:
+        """
+        Fold the scaler into the linear model weights for float64 and float32 scoring.
+        
+        For a StandardScaler followed by logistic regression the decision function
+        ``((x - mean) / scale) @ coef + b`` equals ``x @ (coef / scale) + b'``, so batch
+        scoring is a single matrix-vector product on the raw features.
+        """
+        self._linear_params = {}
+        self.model_fingerprint = None
+        if self.coef_ is None or not hasattr(self.model, 'intercept_') or len(self.coef_) != settings.EXPECTED_FEATURES:
+            return
+        
+        folded = fold_scaler(self.coef_, np.ravel(self.model.intercept_)[0], self.scaler)
+        if folded is None:
+            return
+        weights, intercept = folded
+        intercept = float(intercept)
+        self.model_fingerprint = linear_fingerprint(self.coef_, np.ravel(self.model.intercept_), self.scaler)
+        
+        for dtype in (np.float64, np.float32):
+            self._linear_params[np.dtype(dtype)] = (weights.astype(dtype), dtype(intercept))
+    
+    def _load_ensemble(self) -> None:
+        """
+        Load the bootstrap ensemble (``ensemble_<model_id>.npz``) if one was trained.
+        
+        Member weights are stored already folded onto raw features and are stacked
+        behind the served model's weights, so one matrix product scores both. An
+        ensemble whose ``model_fingerprint`` does not match the served model and
+        scaler is ignored.
+        """
+        self._ensemble = {}
+        self.ensemble_size = 0
+        ensemble_path = self.models_dir / f"ensemble_{self.model_id}.npz"
+        if not ensemble_path.exists():
+            return
+        if not self._linear_params:
+            logger.warning("⚠️ Ensemble found but the served model is not linear - uncertainty disabled")
+            return
+        
+        with np.load(ensemble_path) as data:
+            member_weights = np.asarray(data["weights"], dtype=np.float64)
+            member_intercepts = np.asarray(data["intercepts"], dtype=np.float64)
+            fingerprint = str(data["model_fingerprint"]) if "model_fingerprint" in data.files else None
+        if fingerprint != self.model_fingerprint:
+            logger.warning(
+                f"⚠️ Ignoring {ensemble_path.name}: not trained against the served model and scaler "
+                "- retrain it with app.services.ensemble"
+            )
+            return
+        if member_weights.ndim != 2 or member_weights.shape[1] != settings.EXPECTED_FEATURES:
+            logger.warning(f"⚠️ Ignoring ensemble with weights of shape {member_weights.shape}")
+            return
+        
+        weights, intercept = self._linear_params[np.dtype(np.float64)]
+        stacked_weights = np.vstack([weights, member_weights]).T
+        stacked_intercepts = np.concatenate([[intercept], member_intercepts])
+        for dtype in (np.float64, np.float32):
+            self._ensemble[np.dtype(dtype)] = (
+                np.ascontiguousarray(stacked_weights, dtype=dtype), stacked_intercepts.astype(dtype)
+            )
+        self.ensemble_size = member_weights.shape[0]
+        logger.info(f"✅ Loaded bootstrap ensemble ({self.ensemble_size} models) for uncertainty")
+    
+    def predict_uncertainty_batch(self, features: np.ndarray,
+                                  interval: Optional[float] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Malignancy probabilities with bootstrap-ensemble uncertainty from one matrix product.
+        
+        The served model and all ensemble members are scored together as
+        ``features @ W`` with ``W`` of shape (30, 1 + k). The interval is centred on
+        the served model's logit and spans a normal approximation of the members'
+        spread in logit space, mapped back through the sigmoid, so it always brackets
+        ``probability``. Tier stability compares every member's logit with the logit
+        thresholds, so neither needs a per-member sort or ``exp``.
+        
+        Args:
+            features: Input features as numpy array (n_samples, 30); float32 input
+                is scored in float32
+            interval: Central probability interval covered by ``lower``/``upper``
+                (defaults to settings.UNCERTAINTY_INTERVAL)
+            
+        Returns:
+            Dictionary of (n_samples,) arrays: ``probability`` (served model),
+            ``lower``/``upper`` and ``tier_stability`` (fraction of ensemble members
+            assigning the served model's risk tier), or None if no ensemble is loaded
+            
+        Raises:
+            ValueError: If ``interval`` is not strictly between 0 and 1
+        """
+        dtype = np.dtype(np.float32) if features.dtype == np.float32 else np.dtype(np.float64)
+        params = self._ensemble.get(dtype)
+        if params is None:
+            return None
+        interval = settings.UNCERTAINTY_INTERVAL if interval is None else interval
+        if not 0 < interval < 1:
+            raise ValueError(f"Uncertainty interval must be between 0 and 1, got {interval}")
+        z_score = NormalDist().inv_cdf(0.5 + interval / 2)
+        
+        weights, intercepts = params
+        logits = np.asarray(features, dtype=dtype) @ weights
+        logits += intercepts
+        center = logits[:, 0]
+        spread = z_score * logits[:, 1:].std(axis=1)
+        
+        low_logit, high_logit = (
+            np.log(t / (1 - t)) for t in (settings.LOW_RISK_THRESHOLD, settings.HIGH_RISK_THRESHOLD)
+        )
+        codes = (logits >= low_logit).astype(np.int8)
+        codes += logits >= high_logit
+        tier_stability = np.mean(codes[:, 1:] == codes[:, :1], axis=1)
+        
+        with np.errstate(over='ignore'):
+            return {
+                "probability": 1.0 / (1.0 + np.exp(-center)),
+                "lower": 1.0 / (1.0 + np.exp(spread - center)),
+                "upper": 1.0 / (1.0 + np.exp(-center - spread)),
+                "tier_stability": tier_stability,
+            }
+    
+    def uncertainty_items(self, uncertainty: Optional[Dict[str, np.ndarray]], n_rows: int) -> list:
+        """
+        Per-row response dictionaries from ``predict_uncertainty_batch`` output.
+        
+        Args:
+            uncertainty: Output of ``predict_uncertainty_batch`` (may be None)
+            n_rows: Number of scored rows
+            
+        Returns:
+            One dictionary per row, or ``n_rows`` None values without an ensemble
+        """
+        if uncertainty is None:
+            return [None] * n_rows
+        return [
+            {
+                "probability_lower": lower,
+                "probability_upper": upper,
+                "tier_stability": stability,
+                "interval": settings.UNCERTAINTY_INTERVAL,
+                "ensemble_size": self.ensemble_size,
+            }
+            for lower, upper, stability in zip(
+                uncertainty["lower"].tolist(), uncertainty["upper"].tolist(),
+                uncertainty["tier_stability"].tolist()
+            )
+        ]
+    
     def preprocess_features(self, features: np.ndarray) -> np.ndarray:
         """
         Preprocess input features (scaling, normalization).
@@ -170,6 +394,53 @@ class MLService:
         features_processed = self.preprocess_features(features)
         return self.model.predict_proba(features_processed)[0]
     
+    def predict_proba_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Get malignancy probabilities for many samples in one vectorized call.
+        
+        The computation runs in the dtype of ``features``: pass float32 input for the
+        reduced-precision path (half the memory traffic of float64), anything else is
+        scored in float64.
+        
+        Args:
+            features: Input features as numpy array (n_samples, 30)
+            
+        Returns:
+            Array of malignancy probabilities (n_samples,) in the input precision
+        """
+        dtype = np.dtype(np.float32) if features.dtype == np.float32 else np.dtype(np.float64)
+        features = np.asarray(features, dtype=dtype)
+        
+        params = self._linear_params.get(dtype)
+        if params is not None:
+            weights, intercept = params
+            logits = features @ weights
+            logits += intercept
+            with np.errstate(over='ignore'):
+                np.negative(logits, out=logits)
+                np.exp(logits, out=logits)
+            logits += 1
+            return np.reciprocal(logits, out=logits)
+        
+        # Non-linear models: scale and evaluate through the estimator in the requested dtype
+        features_processed = self.preprocess_features(features).astype(dtype, copy=False)
+        return self.model.predict_proba(features_processed)[:, 1].astype(dtype, copy=False)
+    
+    def stratify_risk_batch(self, probabilities_malignant: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of ``stratify_risk``.
+        
+        Args:
+            probabilities_malignant: Malignancy probabilities (n_samples,)
+            
+        Returns:
+            Array of risk categories ("Low", "Medium", "High")
+        """
+        tiers = np.array(RISK_TIERS)
+        codes = (probabilities_malignant >= settings.LOW_RISK_THRESHOLD).astype(np.int8)
+        codes += probabilities_malignant >= settings.HIGH_RISK_THRESHOLD
+        return tiers[codes]
+    
     def stratify_risk(self, probability_malignant: float) -> str:
         """
         Stratify patient into risk category based on malignancy probability.
@@ -229,6 +500,7 @@ class MLService:
             },
             "model_version": self.model_metadata.get("model_name", "Logistic Regression v1.0")
             ,"explanations": self.explain(features)
+            ,"uncertainty": self.uncertainty_items(self.predict_uncertainty_batch(features), len(features))[0]
         }
 
     def explain(self, features: np.ndarray, top_k: int = 8) -> list:
@@ -279,6 +551,40 @@ class MLService:
             logger.warning(f"Explanation generation failed: {e}")
             return []
     
+    def explain_batch(self, features: np.ndarray, top_k: int = 8) -> list:
+        """
+        Vectorized version of ``explain`` for many samples.
+        
+        Args:
+            features: Input features as numpy array (n_samples, n_features)
+            top_k: Number of top contributing features to return per sample
+            
+        Returns:
+            One explanation list per sample, in the same format as ``explain``
+        """
+        n_samples = features.shape[0]
+        if self.coef_ is None or features.shape[1] != self.coef_.shape[0]:
+            return [[] for _ in range(n_samples)]
+        
+        contributions = np.asarray(self.preprocess_features(features)) * self.coef_
+        abs_contributions = np.abs(contributions)
+        top = np.argsort(-abs_contributions, axis=1, kind='stable')[:, :top_k]
+        names = self.feature_names or [f"f{i}" for i in range(contributions.shape[1])]
+        
+        explanations = []
+        for row, order in enumerate(top):
+            items = []
+            for i in order:
+                c = float(contributions[row, i])
+                items.append({
+                    "feature": names[i],
+                    "contribution": c,
+                    "abs_contribution": abs(c),
+                    "direction": "increases risk" if c > 0 else "decreases risk" if c < 0 else "no effect"
+                })
+            explanations.append(items)
+        return explanations
+    
     def is_loaded(self) -> bool:
         """Check if model is loaded and ready."""
         return self.model is not None
@@ -290,5 +596,6 @@ class MLService:
             "scaler_type": type(self.scaler).__name__ if self.scaler else None,
             "n_features": len(self.feature_names) if self.feature_names else 0,
             "metadata": self.model_metadata,
+            "ensemble_size": self.ensemble_size,
             "is_loaded": self.is_loaded()
         }
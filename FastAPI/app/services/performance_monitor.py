@@ -0,0 +1,247 @@
+"""
+Live model performance from predictions joined with late-arriving labels.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+from typing import Dict, Any, Optional, Sequence, Tuple
+import logging
+
+from app.core.config import settings
+from app.services.ml_service import RISK_TIERS
+
+logger = logging.getLogger(__name__)
+
+_TIER_INDEX = {tier: i for i, tier in enumerate(RISK_TIERS)}
+
+_SECONDS_PER_DAY = 86400
+
+
+def _rates(confusion: np.ndarray) -> Dict[str, Any]:
+    """Counts, sensitivity and specificity from a [truth, predicted] 2x2 matrix."""
+    tn, fp, fn, tp = (int(v) for v in confusion.ravel())
+    return {
+        "n": tn + fp + fn + tp,
+        "true_positives": tp,
+        "false_positives": fp,
+        "true_negatives": tn,
+        "false_negatives": fn,
+        "sensitivity": tp / (tp + fn) if tp + fn else None,
+        "specificity": tn / (tn + fp) if tn + fp else None,
+        "accuracy": (tp + tn) / (tn + fp + fn + tp) if tn + fp + fn + tp else None,
+    }
+
+
+class PerformanceMonitor:
+    """
+    Incrementally maintained confusion matrices for the deployed model.
+
+    Predictions that carry a case id are kept in a bounded index keyed by case
+    id until their ground-truth label arrives. Each join adds one count to a
+    per-day ``(tier, truth, predicted)`` matrix for the day the prediction was
+    made; the rolling window is the sum of the most recent ``window_days``
+    matrices, so reports never rescan the prediction history.
+
+    Joined cases stay in a second bounded index, so a label sent again for
+    the same case is counted once: an identical label is reported as a
+    duplicate and a different one corrects the earlier join.
+    """
+
+    def __init__(
+        self,
+        window_days: int = 30,
+        max_pending: int = 1_000_000,
+        decision_threshold: float = 0.5,
+    ):
+        """
+        Initialize performance monitor.
+
+        Args:
+            window_days: Number of days of predictions in the rolling window
+            max_pending: Maximum unlabeled predictions (and unmatched labels, joined cases) kept
+            decision_threshold: Probability at or above which a prediction counts as Malignant
+        """
+        self.window_days = window_days
+        self.max_pending = max_pending
+        self.decision_threshold = decision_threshold
+
+        # case_id -> (timestamp, probability_malignant, risk_category)
+        self._pending: "OrderedDict[str, Tuple[float, float, str]]" = OrderedDict()
+        # case_id -> label, for labels that arrived before their prediction was indexed
+        self._unmatched_labels: "OrderedDict[str, int]" = OrderedDict()
+        # case_id -> (timestamp, probability_malignant, risk_category, label), for joined cases
+        self._joined: "OrderedDict[str, Tuple[float, float, str, int]]" = OrderedDict()
+        # day number -> counts[tier, truth, predicted]
+        self._daily: Dict[int, np.ndarray] = {}
+
+        self.labels_received = 0
+        self.labels_joined = 0
+        self.duplicate_labels = 0
+        self.corrected_labels = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "PerformanceMonitor":
+        """Build a monitor from the configured settings."""
+        return cls(
+            window_days=settings.PERFORMANCE_WINDOW_DAYS,
+            max_pending=settings.PERFORMANCE_MAX_PENDING,
+        )
+
+    def load_from_audit(self, audit_log) -> int:
+        """
+        Rebuild the case index and label joins from stored audit records within the rolling window.
+
+        Predictions are indexed first, then stored labels are replayed against
+        them, so cases labeled before a restart are counted again rather than
+        reported as awaiting labels.
+
+        Args:
+            audit_log: AuditLog whose prediction and label segments are scanned
+
+        Returns:
+            Number of predictions indexed
+        """
+        since = datetime.now() - timedelta(days=self.window_days)
+        count = 0
+        replayed = 0
+        with self._lock:
+            for case_id, ts, prob, tier in audit_log.scan_cases(start=since):
+                self._index(case_id, ts, prob, tier)
+                count += 1
+            for case_id, _, label in audit_log.scan_labels(start=since):
+                self._apply_label(case_id, label)
+                replayed += 1
+        logger.info(f"Indexed {count} stored predictions and replayed {replayed} labels for label joining")
+        return count
+
+    def record_predictions(
+        self,
+        case_ids: Sequence[Optional[str]],
+        probabilities: Sequence[float],
+        risk_categories: Sequence[str],
+    ) -> None:
+        """
+        Index new predictions so later labels can be joined to them.
+
+        Rows without a case id are ignored.
+        """
+        ts = time.time()
+        with self._lock:
+            for case_id, prob, tier in zip(case_ids, probabilities, risk_categories):
+                if case_id:
+                    self._index(case_id, ts, float(prob), tier)
+
+    def _index(self, case_id: str, ts: float, prob: float, tier: str) -> None:
+        label = self._unmatched_labels.pop(case_id, None)
+        if label is not None:
+            self._join(case_id, ts, prob, tier, label)
+            return
+        self._pending[case_id] = (ts, prob, tier)
+        self._pending.move_to_end(case_id)
+        if len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.evicted += 1
+
+    def _join(self, case_id: str, ts: float, prob: float, tier: str, label: int) -> None:
+        day = int(ts // _SECONDS_PER_DAY)
+        counts = self._daily.get(day)
+        if counts is None:
+            counts = self._daily[day] = np.zeros((len(RISK_TIERS), 2, 2), dtype=np.int64)
+            self._prune(day)
+        predicted = 1 if prob >= self.decision_threshold else 0
+        counts[_TIER_INDEX.get(tier, 1), label, predicted] += 1
+        self.labels_joined += 1
+
+        self._joined[case_id] = (ts, prob, tier, label)
+        if len(self._joined) > self.max_pending:
+            self._joined.popitem(last=False)
+
+    def _correct(self, case_id: str, label: int) -> None:
+        """Move an already joined case to the cell of its corrected label."""
+        ts, prob, tier, previous = self._joined.pop(case_id)
+        counts = self._daily.get(int(ts // _SECONDS_PER_DAY))
+        if counts is not None:  # otherwise the day has already left the window
+            predicted = 1 if prob >= self.decision_threshold else 0
+            counts[_TIER_INDEX.get(tier, 1), previous, predicted] -= 1
+            counts[_TIER_INDEX.get(tier, 1), label, predicted] += 1
+        self._joined[case_id] = (ts, prob, tier, label)
+
+    def _prune(self, latest_day: int) -> None:
+        cutoff = max(max(self._daily), latest_day) - self.window_days
+        for day in [d for d in self._daily if d <= cutoff]:
+            del self._daily[day]
+
+    def record_labels(self, labels: Sequence[Tuple[str, int]]) -> Dict[str, int]:
+        """
+        Join ground-truth labels with indexed predictions.
+
+        Args:
+            labels: (case_id, label) pairs with label 1 for Malignant, 0 for Benign
+
+        Returns:
+            Counts of labels joined, held for a later prediction, repeated
+            for an already joined case, and correcting an earlier label
+        """
+        result = {"matched": 0, "unmatched": 0, "duplicates": 0, "corrected": 0}
+        with self._lock:
+            for case_id, label in labels:
+                result[self._apply_label(case_id, label)] += 1
+        return result
+
+    def _apply_label(self, case_id: str, label: int) -> str:
+        """
+        Join one label with its indexed prediction, or hold it until the prediction arrives.
+
+        Returns:
+            Which ``record_labels`` count the label falls under
+        """
+        self.labels_received += 1
+        label = int(label)
+        joined = self._joined.get(case_id)
+        if joined is not None:
+            if joined[3] == label:
+                self.duplicate_labels += 1
+                return "duplicates"
+            self._correct(case_id, label)
+            self.corrected_labels += 1
+            return "corrected"
+
+        entry = self._pending.pop(case_id, None)
+        if entry is None:
+            self._unmatched_labels[case_id] = label
+            if len(self._unmatched_labels) > self.max_pending:
+                self._unmatched_labels.popitem(last=False)
+            return "unmatched"
+        ts, prob, tier = entry
+        self._join(case_id, ts, prob, tier, label)
+        return "matched"
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Rolling confusion matrices, sensitivity and specificity overall and per risk tier.
+        """
+        cutoff = int(time.time() // _SECONDS_PER_DAY) - self.window_days
+        with self._lock:
+            window = [c for day, c in self._daily.items() if day > cutoff]
+            totals = np.sum(window, axis=0) if window else np.zeros((len(RISK_TIERS), 2, 2), dtype=np.int64)
+            pending = len(self._pending)
+            unmatched = len(self._unmatched_labels)
+
+        return {
+            "window_days": self.window_days,
+            "decision_threshold": self.decision_threshold,
+            "overall": _rates(totals.sum(axis=0)),
+            "by_risk_tier": {tier: _rates(totals[i]) for i, tier in enumerate(RISK_TIERS)},
+            "labels_received": self.labels_received,
+            "labels_joined": self.labels_joined,
+            "duplicate_labels": self.duplicate_labels,
+            "corrected_labels": self.corrected_labels,
+            "awaiting_labels": pending,
+            "unmatched_labels": unmatched,
+            "evicted_predictions": self.evicted,
+        }
@@ -0,0 +1,103 @@
+"""
+Parity check between the float64 and float32 inference paths.
+
+Usage (from the FastAPI directory):
+    python -m app.services.precision_check --data ../data.csv --models-dir ../saved_models
+"""
+
+import argparse
+import sys
+from pathlib import Path
+import numpy as np
+from typing import Dict, Any
+import logging
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+from app.services.ml_service import MLService
+
+logger = logging.getLogger(__name__)
+
+# Largest acceptable absolute probability difference between float32 and float64
+DEFAULT_TOLERANCE = 1e-5
+
+
+def check_float32_parity(ml_service: MLService, features: np.ndarray,
+                         tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """
+    Compare float32 batch scoring against float64 and the estimator itself.
+
+    The check fails if any row changes risk tier or diagnosis, or if the largest
+    probability difference exceeds ``tolerance``.
+
+    Args:
+        ml_service: Loaded ML service
+        features: Raw feature matrix (n_samples, 30)
+        tolerance: Maximum allowed absolute probability difference
+
+    Returns:
+        Dictionary with difference statistics, flip counts and a ``passed`` flag
+
+    Raises:
+        ValueError: If the model is not loaded
+    """
+    if ml_service.model is None:
+        raise ValueError("Model is not loaded")
+
+    reference = ml_service.model.predict_proba(
+        ml_service.preprocess_features(features.astype(np.float64))
+    )[:, 1]
+    prob64 = ml_service.predict_proba_batch(features.astype(np.float64))
+    prob32 = ml_service.predict_proba_batch(features.astype(np.float32))
+
+    tiers_ref = ml_service.stratify_risk_batch(reference)
+    tiers64 = ml_service.stratify_risk_batch(prob64)
+    tiers32 = ml_service.stratify_risk_batch(prob32)
+
+    diff32 = np.abs(prob32.astype(np.float64) - reference)
+    diff64 = np.abs(prob64 - reference)
+
+    result = {
+        "n_samples": int(features.shape[0]),
+        "tolerance": tolerance,
+        "float64_max_abs_diff": float(diff64.max(initial=0.0)),
+        "float32_max_abs_diff": float(diff32.max(initial=0.0)),
+        "float32_mean_abs_diff": float(diff32.mean()) if diff32.size else 0.0,
+        "float64_tier_flips": int(np.sum(tiers64 != tiers_ref)),
+        "float32_tier_flips": int(np.sum(tiers32 != tiers_ref)),
+        "float32_diagnosis_flips": int(np.sum((prob32 > 0.5) != (reference > 0.5))),
+    }
+    result["passed"] = (
+        result["float64_tier_flips"] == 0
+        and result["float32_tier_flips"] == 0
+        and result["float32_diagnosis_flips"] == 0
+        and result["float32_max_abs_diff"] <= tolerance
+    )
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check float32 inference parity against float64")
+    parser.add_argument("--data", type=Path, default=Path(__file__).parents[3] / "data.csv",
+                        help="Labeled CSV with the 30 feature columns")
+    parser.add_argument("--models-dir", type=Path, default=settings.MODELS_DIR,
+                        help="Directory containing saved model artifacts")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Maximum allowed absolute probability difference")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    ml_service = MLService(models_dir=args.models_dir)
+    ml_service.load_models()
+    features = DatasetStore.from_settings().load(args.data).features
+
+    result = check_float32_parity(ml_service, features, tolerance=args.tolerance)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
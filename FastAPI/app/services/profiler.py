@@ -0,0 +1,329 @@
+"""
+On-demand request profiling for live traffic.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = "cprofile"
+SAMPLING = "sampling"
+
+# From Python 3.12 cProfile is built on sys.monitoring: a single profile sees every
+# thread, and enabling a second one while it runs raises ValueError
+_PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+# Capture for the request currently being handled, visible in threadpool workers
+_current_capture: ContextVar[Optional["_RequestCapture"]] = ContextVar("profiling_capture", default=None)
+
+
+def _start_profile() -> Optional[cProfile.Profile]:
+    """Enable a new cProfile profile, or return None if another profiler is already active."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:
+        logger.warning(f"⚠️ Could not start cProfile, running unprofiled: {str(e)}")
+        return None
+    return profile
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _fold_stack(frame) -> str:
+    """Render a frame chain root-first in collapsed-stack format (``a;b;c``)."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _RequestCapture:
+    """Profiling state for one selected request across the loop thread and workers."""
+
+    def __init__(self, session: "_ProfilingSession"):
+        self.session = session
+        self.profiles: List[cProfile.Profile] = []
+
+    def run(self, func, *args):
+        """Run ``func`` in a threadpool worker under this capture."""
+        thread_id = threading.get_ident()
+        if self.session.mode == CPROFILE:
+            # On 3.12+ the event loop profile already covers worker threads
+            profile = None if _PROCESS_WIDE_PROFILER else _start_profile()
+            if profile is None:
+                return func(*args)
+            try:
+                return func(*args)
+            finally:
+                profile.disable()
+                self.profiles.append(profile)
+        self.session.add_thread(thread_id)
+        try:
+            return func(*args)
+        finally:
+            self.session.remove_thread(thread_id)
+
+
+class _ProfilingSession:
+    """One armed profiling session for a single endpoint."""
+
+    def __init__(self, endpoint: str, mode: str, requests: Optional[int],
+                 sample_rate: float, sample_interval: float):
+        self.endpoint = endpoint
+        self.mode = mode
+        self.remaining = requests
+        self.sample_rate = sample_rate
+        self.sample_interval = sample_interval
+        self.started_at = time.time()
+        self.completed = 0
+        self.skipped = 0
+        self.in_progress = 0
+
+        self.stats: Optional[pstats.Stats] = None
+        self.folded: Counter = Counter()
+
+        self._lock = threading.Lock()
+        self._loop_profile_busy = False
+        self._thread_refs: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        if mode == SAMPLING:
+            self._sampler = threading.Thread(target=self._sample_loop, name="request-sampler", daemon=True)
+            self._sampler.start()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining is not None and self.remaining <= 0
+
+    def select(self, path: str) -> bool:
+        """Decide whether the request to ``path`` is profiled."""
+        if path != self.endpoint or self.exhausted:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self.exhausted:
+                return False
+            if self.mode == CPROFILE:
+                # Only one profiler can be active on the event loop thread
+                if self._loop_profile_busy:
+                    self.skipped += 1
+                    return False
+                self._loop_profile_busy = True
+            if self.remaining is not None:
+                self.remaining -= 1
+            self.in_progress += 1
+        return True
+
+    def add_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._thread_refs[thread_id] += 1
+
+    def remove_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._thread_refs[thread_id] -= 1
+            if self._thread_refs[thread_id] <= 0:
+                del self._thread_refs[thread_id]
+
+    def finish(self, capture: _RequestCapture, loop_profile: Optional[cProfile.Profile]) -> None:
+        """Merge a completed request capture into the session results."""
+        with self._lock:
+            if self.mode == CPROFILE:
+                self._loop_profile_busy = False
+            if loop_profile is not None:
+                for profile in [loop_profile, *capture.profiles]:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+            self.completed += 1
+            self.in_progress -= 1
+
+    @property
+    def done(self) -> bool:
+        """All requested captures have completed."""
+        return self.exhausted and self.in_progress == 0
+
+    def _sample_loop(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                thread_ids = [t for t in self._thread_refs if t != sampler_id]
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            stacks = [_fold_stack(frames[t]) for t in thread_ids if t in frames]
+            with self._lock:
+                self.folded.update(stacks)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1.0)
+
+    def export(self) -> bytes:
+        """
+        Serialize results.
+
+        cProfile sessions export a ``pstats`` dump (snakeviz, flameprof, gprof2dot);
+        sampling sessions export collapsed stacks (flamegraph.pl, speedscope).
+        """
+        with self._lock:
+            if self.mode == CPROFILE:
+                if self.stats is None:
+                    return b""
+                return marshal.dumps(self.stats.stats)  # type: ignore[attr-defined]
+            buffer = io.StringIO()
+            for stack, count in self.folded.most_common():
+                buffer.write(f"{stack} {count}\n")
+            return buffer.getvalue().encode("utf-8")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "endpoint": self.endpoint,
+                "mode": self.mode,
+                "remaining_requests": self.remaining,
+                "sample_rate": self.sample_rate,
+                "completed_requests": self.completed,
+                "skipped_requests": self.skipped,
+                "started_at": self.started_at,
+                "samples": sum(self.folded.values()) if self.mode == SAMPLING else None,
+            }
+
+
+class RequestProfiler:
+    """
+    Admin-controlled profiler for live requests.
+
+    While no session is armed, ``active`` is False and the middleware passes
+    requests straight through. An armed session profiles the next N requests to
+    one endpoint and/or a random fraction of them, covering the whole ASGI call
+    (routing, validation, inference and serialization). Inference dispatched with
+    ``run_in_threadpool_profiled`` is profiled in its worker thread as well.
+
+    cProfile mode profiles the event loop thread, so coroutines of concurrent
+    requests interleaved with the selected one are included in its profile. On
+    Python 3.12+ cProfile is process-wide, so one profile covers the loop and
+    worker threads together (including other requests' workers). If another
+    profiler is already active, the request runs unprofiled.
+    """
+
+    def __init__(self):
+        self.session: Optional[_ProfilingSession] = None
+        self.active = False
+
+    def start(self, endpoint: str, mode: str = CPROFILE, requests: Optional[int] = None,
+              sample_rate: float = 1.0) -> Dict[str, Any]:
+        """
+        Arm a profiling session, replacing any previous one.
+
+        Args:
+            endpoint: Request path to profile, e.g. ``/api/v1/predict``
+            mode: ``cprofile`` (deterministic) or ``sampling`` (stack sampling)
+            requests: Stop after this many profiled requests (None for no limit)
+            sample_rate: Fraction of matching requests to profile
+        """
+        if mode not in (CPROFILE, SAMPLING):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if requests is None and sample_rate >= 1.0:
+            raise ValueError("Set a request count or a sample rate below 1.0")
+
+        self.stop()
+        self.session = _ProfilingSession(
+            endpoint, mode, requests, sample_rate, settings.PROFILING_SAMPLE_INTERVAL
+        )
+        self.active = True
+        logger.info(f"Profiling armed: {mode} on {endpoint} (requests={requests}, rate={sample_rate})")
+        return self.session.status()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """Disarm profiling; results remain available for download."""
+        self.active = False
+        if self.session is None:
+            return None
+        self.session.stop()
+        logger.info("Profiling stopped")
+        return self.session.status()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "session": self.session.status() if self.session is not None else None,
+        }
+
+    def export(self) -> Optional[bytes]:
+        return self.session.export() if self.session is not None else None
+
+    def begin(self, path: str) -> Optional[_RequestCapture]:
+        """Select a request for profiling and start capturing on the current thread."""
+        session = self.session
+        if session is None or not session.select(path):
+            return None
+        if session.exhausted:
+            self.active = False
+        return _RequestCapture(session)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that hands selected requests to the ``RequestProfiler``."""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.active or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        capture = self.profiler.begin(scope["path"])
+        if capture is None:
+            return await self.app(scope, receive, send)
+
+        session = capture.session
+        token = _current_capture.set(capture)
+        loop_profile = None
+        loop_thread = threading.get_ident()
+        if session.mode == CPROFILE:
+            loop_profile = _start_profile()
+        else:
+            session.add_thread(loop_thread)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if loop_profile is not None:
+                loop_profile.disable()
+            elif session.mode != CPROFILE:
+                session.remove_thread(loop_thread)
+            _current_capture.reset(token)
+            session.finish(capture, loop_profile)
+            if session.done:
+                session.stop()
+
+
+async def run_in_threadpool_profiled(func, *args):
+    """``run_in_threadpool`` that extends an active request profile into the worker thread."""
+    capture = _current_capture.get()
+    if capture is None:
+        return await run_in_threadpool(func, *args)
+    return await run_in_threadpool(capture.run, func, *args)
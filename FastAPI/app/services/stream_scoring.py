@@ -0,0 +1,250 @@
+"""
+WebSocket streaming scoring with internal micro-batching.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+import numpy as np
+from typing import Dict, Any, List, Optional
+import logging
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.schemas import FeatureInput
+from app.models.validation import validate_feature_rows
+from app.services.admission import BATCH, AdmissionRejected
+from app.services.profiler import run_in_threadpool_profiled
+
+logger = logging.getLogger(__name__)
+
+# Binary record: little-endian uint64 correlation id followed by the 30 features
+BINARY_DTYPES = {
+    "float64": np.dtype([("id", "<u8"), ("features", "<f8", (settings.EXPECTED_FEATURES,))]),
+    "float32": np.dtype([("id", "<u8"), ("features", "<f4", (settings.EXPECTED_FEATURES,))]),
+}
+
+
+class StreamScoringSession:
+    """
+    One WebSocket client streaming cases for scoring.
+
+    The connection task parses frames into rows on a bounded queue, a scorer task
+    drains up to ``max_batch`` rows (waiting at most ``batch_window`` seconds
+    for more) and scores them in one vectorized call, and a sender task pushes
+    results back. Each stage blocks when the next one is full, so a slow reader
+    stops the receiver and the client's sends back up over TCP.
+
+    Accepted frames:
+    - text: one JSON object or a list of them, each ``{"id": ..., "features": {...}}``
+      (``FeatureInput`` fields, optional ``case_id``) or ``{"id": ..., "values": [30 floats]}``
+    - binary: packed records of uint64 id + 30 floats (``float64`` or ``float32``)
+
+    Each result frame is ``{"results": [...]}`` with one ``/risk-stratify``-shaped
+    item per row, tagged with the client's ``id``.
+    """
+
+    def __init__(self, websocket: WebSocket, binary_format: str = "float64", explain: bool = True):
+        self.websocket = websocket
+        self.app = websocket.app
+        self.ml_service = websocket.app.state.ml_service
+        self.binary_dtype = BINARY_DTYPES[binary_format]
+        self.explain = explain
+
+        self.max_batch = settings.WS_MAX_BATCH
+        self.batch_window = settings.WS_BATCH_WINDOW_MS / 1000.0
+        # Items: (id, feature row or None, case_id, error message or None)
+        self._incoming: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MAX_PENDING)
+        self._outgoing: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MAX_OUTGOING)
+
+        self.rows_received = 0
+        self.batches_scored = 0
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects."""
+        await self.websocket.accept()
+        workers = [asyncio.create_task(self._score()), asyncio.create_task(self._send())]
+        try:
+            await self._receive(workers)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in workers:
+                task.cancel()
+            logger.info(
+                f"Streaming session closed: {self.rows_received} rows in {self.batches_scored} batches"
+            )
+
+    async def _receive(self, workers: List[asyncio.Task]) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                items = self._parse_binary(message["bytes"])
+            else:
+                items = self._parse_text(message.get("text") or "")
+            for item in items:
+                # Blocks while the scorer is behind, which stops reading from the socket
+                await self._incoming.put(item)
+                if any(task.done() for task in workers):
+                    self._raise_worker_error(workers)
+            self.rows_received += len(items)
+
+    @staticmethod
+    def _raise_worker_error(workers: List[asyncio.Task]) -> None:
+        for task in workers:
+            if not task.done() or task.cancelled():
+                continue
+            error = task.exception()
+            if error is not None:
+                if not isinstance(error, WebSocketDisconnect):
+                    logger.error(f"Streaming session error: {error}")
+                raise error
+        raise WebSocketDisconnect()
+
+    def _parse_binary(self, data: bytes) -> List[tuple]:
+        if len(data) % self.binary_dtype.itemsize:
+            return [(None, None, None, f"Binary frame length must be a multiple of {self.binary_dtype.itemsize} bytes")]
+        records = np.frombuffer(data, dtype=self.binary_dtype)
+        features = records["features"].astype(np.float64)
+        valid = validate_feature_rows(features)
+        return [
+            (int(rid), row, None, None) if ok else (int(rid), None, None, "Feature values out of range")
+            for rid, row, ok in zip(records["id"], features, valid)
+        ]
+
+    def _parse_text(self, text: str) -> List[tuple]:
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            return [(None, None, None, f"Invalid JSON: {e}")]
+        messages = payload if isinstance(payload, list) else [payload]
+        return [self._parse_message(m) for m in messages]
+
+    def _parse_message(self, message: Any) -> tuple:
+        if not isinstance(message, dict):
+            return (None, None, None, "Each message must be a JSON object")
+        rid = message.get("id")
+        try:
+            if "values" in message:
+                row = np.asarray(message["values"], dtype=np.float64)
+                if row.shape != (settings.EXPECTED_FEATURES,):
+                    return (rid, None, None, f"Expected {settings.EXPECTED_FEATURES} values")
+                if not validate_feature_rows(row[np.newaxis, :])[0]:
+                    return (rid, None, None, "Feature values out of range")
+                case_id = message.get("case_id")
+                return (rid, row, str(case_id)[:128] if case_id is not None else None, None)
+            features = FeatureInput(**message.get("features", {}))
+            return (rid, np.asarray(features.to_list()), features.case_id, None)
+        except (ValidationError, TypeError, ValueError) as e:
+            return (rid, None, None, f"Invalid input features: {e}")
+
+    async def _next_batch(self) -> List[tuple]:
+        batch = [await self._incoming.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._incoming.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._incoming.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _score(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            results: List[Optional[Dict[str, Any]]] = [
+                {"id": rid, "error": error} if error else None for rid, _, _, error in batch
+            ]
+            scored = [i for i, result in enumerate(results) if result is None]
+
+            if scored:
+                features = np.stack([batch[i][1] for i in scored])
+                try:
+                    rows = await self._score_rows(features, [batch[i][2] for i in scored])
+                    for i, row in zip(scored, rows):
+                        results[i] = {"id": batch[i][0], **row}
+                except AdmissionRejected as e:
+                    for i in scored:
+                        results[i] = {"id": batch[i][0], "error": f"Service overloaded: {e.reason}",
+                                      "retry_after": e.retry_after}
+                except Exception as e:
+                    logger.error(f"Streaming scoring error: {str(e)}")
+                    for i in scored:
+                        results[i] = {"id": batch[i][0], "error": f"Risk stratification failed: {str(e)}"}
+                self.batches_scored += 1
+
+            await self._outgoing.put(results)
+
+    async def _score_rows(self, features: np.ndarray, case_ids: List[Optional[str]]) -> List[Dict[str, Any]]:
+        admission = getattr(self.app.state, "admission", None)
+        if admission is not None:
+            await admission.acquire(BATCH)
+        try:
+            start_time = time.perf_counter()
+            probabilities, explanations, uncertainty = await run_in_threadpool_profiled(self._compute, features)
+            latency_ms = (time.perf_counter() - start_time) * 1000
+        finally:
+            if admission is not None:
+                admission.release(BATCH)
+
+        ml_service = self.ml_service
+        tiers = ml_service.stratify_risk_batch(probabilities).tolist()
+        model_version = ml_service.model_metadata.get("model_name", "Logistic Regression v1.0")
+        self._record(features, probabilities, tiers, model_version, latency_ms / len(tiers), case_ids)
+
+        timestamp = datetime.now().isoformat()
+        thresholds = {"low": settings.LOW_RISK_THRESHOLD, "high": settings.HIGH_RISK_THRESHOLD}
+        rows = []
+        for prob, tier, explanation, item in zip(probabilities.tolist(), tiers, explanations, uncertainty):
+            is_malignant = prob > 0.5
+            rows.append({
+                "risk_category": tier,
+                "risk_score": prob,
+                "diagnosis": "Malignant" if is_malignant else "Benign",
+                "confidence": prob if is_malignant else 1.0 - prob,
+                "recommendation": settings.RISK_RECOMMENDATIONS[tier],
+                "thresholds": thresholds,
+                "model_version": model_version,
+                "timestamp": timestamp,
+                "explanations": explanation,
+                "uncertainty": item,
+            })
+        return rows
+
+    def _compute(self, features: np.ndarray):
+        uncertainty = self.ml_service.predict_uncertainty_batch(features)
+        if uncertainty is not None:
+            probabilities = uncertainty["probability"]
+        else:
+            probabilities = self.ml_service.predict_proba_batch(features)
+        explanations = self.ml_service.explain_batch(features) if self.explain else [None] * len(features)
+        return probabilities, explanations, self.ml_service.uncertainty_items(uncertainty, len(features))
+
+    def _record(self, features, probabilities, tiers, model_version, latency_ms, case_ids) -> None:
+        state = self.app.state
+        drift_monitor = getattr(state, "drift_monitor", None)
+        if drift_monitor is not None:
+            drift_monitor.update(features, probabilities)
+        audit_log = getattr(state, "audit_log", None)
+        if audit_log is not None:
+            audit_log.record("ws-score", features, probabilities, tiers, model_version, latency_ms, case_ids)
+        performance_monitor = getattr(state, "performance_monitor", None)
+        if performance_monitor is not None:
+            performance_monitor.record_predictions(case_ids, probabilities, tiers)
+
+    async def _send(self) -> None:
+        while True:
+            results = await self._outgoing.get()
+            await self.websocket.send_text(json.dumps({"results": results}))
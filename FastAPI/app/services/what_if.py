@@ -0,0 +1,147 @@
+"""
+What-if sensitivity sweeps for a single case.
+"""
+
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import logging
+
+from app.core.config import settings
+from app.models.validation import validate_feature_rows
+from app.services.ml_service import MLService
+
+logger = logging.getLogger(__name__)
+
+# Logits are clipped here so saturated probabilities stay finite
+_PROBABILITY_EPS = 1e-12
+
+
+def build_sweep_grid(base: np.ndarray, columns: Sequence[int],
+                     values: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Perturbed copies of one case covering the full grid of swept values.
+
+    Args:
+        base: Base feature row (30,)
+        columns: Feature column index of each swept axis (one or two)
+        values: Swept values of each axis
+
+    Returns:
+        Feature matrix (prod(len(v) for v in values), 30) in row-major grid order
+    """
+    shape = tuple(len(v) for v in values)
+    grid = np.empty(shape + (len(base),), dtype=np.float64)
+    grid[...] = base
+    for axis, (column, axis_values) in enumerate(zip(columns, values)):
+        index: List[Optional[slice]] = [np.newaxis] * len(shape)
+        index[axis] = slice(None)
+        grid[..., column] = axis_values[tuple(index)]
+    return grid.reshape(-1, len(base))
+
+
+def _logit(probabilities: np.ndarray) -> np.ndarray:
+    p = np.clip(probabilities, _PROBABILITY_EPS, 1 - _PROBABILITY_EPS)
+    return np.log(p) - np.log1p(-p)
+
+
+def _crossings(logits: np.ndarray, values: np.ndarray, level: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Where each row of ``logits`` crosses ``level`` along its last axis.
+
+    Interpolation is linear in logit space, which is exact for a logistic model
+    because its logit is linear in every input feature.
+
+    Returns:
+        (row index, interpolated value) for every crossing
+    """
+    left, right = logits[:, :-1] - level, logits[:, 1:] - level
+    rows, cols = np.nonzero((left < 0) != (right < 0))
+    fraction = left[rows, cols] / (left[rows, cols] - right[rows, cols])
+    return rows, values[cols] + fraction * (values[cols + 1] - values[cols])
+
+
+def tier_boundaries(probabilities: np.ndarray, values: List[np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Locate the risk-threshold crossings of a swept probability curve or surface.
+
+    Args:
+        probabilities: Probabilities shaped like the grid (n,) or (n, m)
+        values: Swept values of each axis
+
+    Returns:
+        One entry per threshold with its crossing points: feature values for a
+        curve, ``[x, y]`` pairs for a surface (found along both grid directions)
+    """
+    logits = _logit(probabilities.astype(np.float64))
+    boundaries = []
+    for threshold, lower, upper in (
+        (settings.LOW_RISK_THRESHOLD, "Low", "Medium"),
+        (settings.HIGH_RISK_THRESHOLD, "Medium", "High"),
+    ):
+        level = float(_logit(np.array(threshold)))
+        if logits.ndim == 1:
+            _, crossing = _crossings(logits[np.newaxis, :], values[0], level)
+            points = crossing.tolist()
+        else:
+            rows, along_y = _crossings(logits, values[1], level)
+            cols, along_x = _crossings(logits.T, values[0], level)
+            pairs = np.concatenate([
+                np.column_stack([values[0][rows], along_y]),
+                np.column_stack([along_x, values[1][cols]]),
+            ])
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            points = pairs.tolist()
+        boundaries.append({
+            "threshold": threshold,
+            "from_tier": lower,
+            "to_tier": upper,
+            "crossings": points,
+        })
+    return boundaries
+
+
+def sensitivity_sweep(ml_service: MLService, base: Sequence[float],
+                      axes: List[Tuple[int, float, float, int]]) -> Dict[str, Any]:
+    """
+    Score a one- or two-feature what-if grid around a single case.
+
+    The grid is built as one matrix and scored with a single
+    ``predict_proba_batch`` call (a closed-form matrix-vector product for the
+    linear model).
+
+    Args:
+        ml_service: Loaded ML service
+        base: Base feature row (30,) in ``settings.FEATURE_NAMES`` order
+        axes: (column, start, stop, steps) for each swept feature
+
+    Returns:
+        Dictionary with the swept values, the probability and risk-tier curve
+        (1 axis) or surface (2 axes, indexed [axis 0][axis 1]), the base case
+        score and the risk-tier boundary crossings
+
+    Raises:
+        ValueError: If any grid point violates the feature input constraints
+    """
+    base_row = np.asarray(base, dtype=np.float64)
+    columns = [column for column, _, _, _ in axes]
+    values = [np.linspace(start, stop, steps) for _, start, stop, steps in axes]
+
+    grid = build_sweep_grid(base_row, columns, values)
+    if not validate_feature_rows(grid).all():
+        raise ValueError("Sweep range produces feature values outside the allowed input range")
+
+    scored = ml_service.predict_proba_batch(np.vstack([base_row, grid]))
+    base_probability = float(scored[0])
+    shape = tuple(len(v) for v in values)
+    probabilities = scored[1:].reshape(shape)
+    tiers = ml_service.stratify_risk_batch(scored[1:]).reshape(shape)
+
+    return {
+        "values": [v.tolist() for v in values],
+        "probabilities": probabilities.tolist(),
+        "risk_categories": tiers.tolist(),
+        "base_probability": base_probability,
+        "base_risk_category": ml_service.stratify_risk(base_probability),
+        "boundaries": tier_boundaries(probabilities, values),
+        "grid_size": int(grid.shape[0]),
+    }
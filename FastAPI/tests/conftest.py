@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration for the backend tests.
+"""
+
+import csv
+import os
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time, so point them at the repository artifacts first
+REPO_ROOT = Path(__file__).resolve().parents[2]
+os.environ.setdefault("MODELS_DIR", str(REPO_ROOT / "saved_models"))
+os.environ.setdefault("AUDIT_ENABLED", "false")
+
+
+@pytest.fixture(scope="session")
+def feature_payload():
+    """JSON body for the prediction endpoints built from the first data.csv row."""
+    from app.core.config import settings
+
+    with open(REPO_ROOT / "data.csv", newline="") as f:
+        row = next(csv.DictReader(f))
+    return {name.replace(" ", "_"): float(row[name]) for name in settings.FEATURE_NAMES}
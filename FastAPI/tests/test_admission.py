@@ -0,0 +1,172 @@
+"""
+Tests for admission control and load shedding.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.admission import AdmissionController, AdmissionRejected, BATCH, INTERACTIVE
+
+
+async def _wait_queued(controller: AdmissionController, priority: str, depth: int) -> None:
+    """Let queued acquire() calls run until ``depth`` waiters are queued."""
+    for _ in range(100):
+        if controller.stats()["classes"][priority]["queue_depth"] >= depth:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError(f"{priority} queue never reached depth {depth}")
+
+
+def test_interactive_dispatched_before_batch():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, batch_max_in_flight=1)
+        order = []
+
+        async def request(priority):
+            async with controller.slot(priority):
+                order.append(priority)
+
+        await controller.acquire(INTERACTIVE)
+        batch = asyncio.create_task(request(BATCH))
+        await _wait_queued(controller, BATCH, 1)
+        interactive = asyncio.create_task(request(INTERACTIVE))
+        await _wait_queued(controller, INTERACTIVE, 1)
+
+        controller.release(INTERACTIVE)
+        await asyncio.gather(batch, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == [INTERACTIVE, BATCH]
+
+
+def test_batch_limited_to_batch_max_in_flight():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=4, batch_max_in_flight=2, queue_timeout=0.05)
+        await controller.acquire(BATCH)
+        await controller.acquire(BATCH)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(BATCH)
+
+        # Interactive traffic still gets the remaining slots
+        await controller.acquire(INTERACTIVE)
+        await controller.acquire(INTERACTIVE)
+        return controller.stats()["classes"]
+
+    classes = asyncio.run(scenario())
+    assert classes[BATCH]["in_flight"] == 2
+    assert classes[BATCH]["shed_deadline"] == 1
+    assert classes[INTERACTIVE]["in_flight"] == 2
+
+
+def test_full_queue_rejected_immediately():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue_interactive=0, retry_after=7)
+        await controller.acquire(INTERACTIVE)
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire(INTERACTIVE)
+        return controller, excinfo.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert rejected.retry_after == 7
+    assert controller.stats()["classes"][INTERACTIVE]["shed_queue_full"] == 1
+
+
+def test_deadline_expiry_rejects_and_dequeues():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_timeout=10.0)
+        await controller.acquire(INTERACTIVE)
+        with pytest.raises(AdmissionRejected, match="deadline"):
+            await controller.acquire(INTERACTIVE, timeout=0.01)
+        return controller.stats()["classes"][INTERACTIVE]
+
+    stats = asyncio.run(scenario())
+    assert stats["shed_deadline"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 1
+
+
+def test_cancelled_waiter_is_dequeued():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(controller.acquire(INTERACTIVE))
+        await _wait_queued(controller, INTERACTIVE, 1)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release(INTERACTIVE)
+        return controller.stats()["classes"][INTERACTIVE]
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_cancelled_waiter_hands_granted_slot_back():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(controller.acquire(INTERACTIVE))
+        await _wait_queued(controller, INTERACTIVE, 1)
+
+        # The slot is granted to the waiter, which is cancelled before it resumes
+        controller.release(INTERACTIVE)
+        waiter.cancel()
+        try:
+            await waiter
+            held = True  # Python < 3.12 wait_for may return the result despite the cancel
+        except asyncio.CancelledError:
+            held = False
+
+        in_flight = controller.stats()["classes"][INTERACTIVE]["in_flight"]
+        if held:
+            controller.release(INTERACTIVE)
+        # Either way the slot is free again for the next request
+        await asyncio.wait_for(controller.acquire(INTERACTIVE), timeout=0.1)
+        return held, in_flight
+
+    held, in_flight = asyncio.run(scenario())
+    assert in_flight == (1 if held else 0)
+
+
+def test_slot_granted_at_deadline_is_handed_back(monkeypatch):
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire(INTERACTIVE)
+
+        async def wait_for_granted_at_deadline(waiter, timeout):
+            # The slot is granted in the same loop iteration the deadline fires
+            controller.release(INTERACTIVE)
+            assert waiter.done()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(asyncio, "wait_for", wait_for_granted_at_deadline)
+        with pytest.raises(AdmissionRejected, match="deadline"):
+            await controller.acquire(INTERACTIVE)
+        monkeypatch.undo()
+
+        await asyncio.wait_for(controller.acquire(INTERACTIVE), timeout=0.1)
+        return controller.stats()["classes"][INTERACTIVE]
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["shed_deadline"] == 1
+
+
+def test_predict_sheds_with_503_and_retry_after(feature_payload):
+    with TestClient(app) as client:
+        controller = AdmissionController(max_in_flight=1, max_queue_interactive=0, retry_after=3)
+        asyncio.run(controller.acquire(INTERACTIVE))
+        app.state.admission = controller
+
+        response = client.post(f"{settings.API_PREFIX}/predict", json=feature_payload)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,91 @@
+"""
+Tests for the prediction audit log segment writer.
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.audit_log import AuditLog
+
+
+def _record(audit_log: AuditLog, n: int, endpoint: str, model_version: str, case_prefix: str) -> None:
+    features = np.random.default_rng(0).random((n, 30))
+    audit_log.record(
+        endpoint,
+        features,
+        probabilities=[0.1] * n,
+        risk_categories=["Low"] * n,
+        model_version=model_version,
+        latency_ms=1.0,
+        case_ids=[f"{case_prefix}{i}" for i in range(n)],
+    )
+
+
+def test_flushes_roll_into_one_segment(tmp_path):
+    audit_log = AuditLog(tmp_path, max_segment_rows=1000, roll_interval=3600)
+    _record(audit_log, 3, "/predict", "v1", "a")
+    audit_log.flush()
+    _record(audit_log, 4, "/batch-predict", "v2", "b")
+    audit_log.flush()
+    audit_log.record_labels([("a0", 1), ("b1", 0)])
+    audit_log.flush()
+
+    # Not yet due: parts stay in place until they span the roll interval or fill a segment
+    assert audit_log.compact() == 0
+    assert audit_log.stats()["parts"] == 3
+
+    assert audit_log.compact(force=True) == 3
+    stats = audit_log.stats()
+    assert stats["parts"] == 0
+    assert stats["segments"] == 2
+    assert sorted(p.name.split("_")[0] for p in tmp_path.glob("*.npz")) == ["audit", "labels"]
+
+    records = audit_log.query()
+    assert len(records) == 7
+    assert [r["endpoint"] for r in records] == ["/predict"] * 3 + ["/batch-predict"] * 4
+    assert len(audit_log.query(model_version="v2")) == 4
+    assert [c[0] for c in audit_log.scan_cases()][:2] == ["a0", "a1"]
+    assert [(case_id, label) for case_id, _, label in audit_log.scan_labels()] == [("a0", 1), ("b1", 0)]
+
+
+def test_parts_roll_at_max_segment_rows(tmp_path):
+    audit_log = AuditLog(tmp_path, max_segment_rows=5, roll_interval=3600)
+    for prefix in "abc":
+        _record(audit_log, 3, "/predict", "v1", prefix)
+        audit_log.flush()
+
+    assert audit_log.compact() == 3
+    assert audit_log.stats()["segments"] == 2
+    assert len(audit_log.query()) == 9
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    audit_log = AuditLog(tmp_path, max_segment_rows=1000)
+    _record(audit_log, 3, "/predict", "v1", "a")
+    audit_log.flush()
+    audit_log.compact(force=True)
+    _record(audit_log, 2, "/predict", "v1", "b")
+    audit_log.flush()
+
+    reopened = AuditLog(tmp_path, max_segment_rows=1000)
+    stats = reopened.stats()
+    assert (stats["segments"], stats["parts"]) == (1, 1)
+    assert len(reopened.query()) == 5
+
+    # New files continue the sequence instead of overwriting existing ones
+    _record(reopened, 1, "/predict", "v1", "c")
+    reopened.flush()
+    reopened.compact(force=True)
+    assert len(reopened.query()) == 6
+
+
+def test_audit_endpoint_requires_admin_token(monkeypatch):
+    with TestClient(app) as client:
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        assert client.get(f"{settings.API_PREFIX}/audit").status_code == 403
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        response = client.get(f"{settings.API_PREFIX}/audit", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
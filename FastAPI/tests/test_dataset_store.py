@@ -0,0 +1,58 @@
+"""
+Tests for the cached dataset store.
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+
+
+def _write_csv(path, diagnoses, with_id=True):
+    header = (["id"] if with_id else []) + ["diagnosis"] + settings.FEATURE_NAMES
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i, diagnosis in enumerate(diagnoses):
+            row = ([str(1000 + i)] if with_id else []) + [diagnosis]
+            writer.writerow(row + [f"{0.1 * (i + 1):.3f}"] * len(settings.FEATURE_NAMES))
+    return path
+
+
+@pytest.mark.parametrize("diagnoses", [["M", "B", "M"], ["1", "0", "1"], ["Malignant", "benign", "MALIGNANT"]])
+def test_label_codings(tmp_path, diagnoses):
+    store = DatasetStore(tmp_path / "cache")
+    dataset = store.load(_write_csv(tmp_path / "data.csv", diagnoses))
+
+    assert dataset.labels.tolist() == [1, 0, 1]
+    assert dataset.ids.tolist() == [1000, 1001, 1002]
+
+
+def test_unknown_label_names_the_line(tmp_path):
+    store = DatasetStore(tmp_path / "cache")
+    path = _write_csv(tmp_path / "data.csv", ["M", "B", "X"])
+
+    with pytest.raises(ValueError, match="'X' on line 4"):
+        store.load(path)
+
+
+def test_missing_id_column_uses_row_indices(tmp_path):
+    store = DatasetStore(tmp_path / "cache")
+    dataset = store.load(_write_csv(tmp_path / "data.csv", ["B"] * 12, with_id=False))
+
+    assert dataset.ids.dtype == np.int64
+    assert dataset.ids.tolist() == list(range(12))
+
+
+def test_reload_hits_cache(tmp_path):
+    store = DatasetStore(tmp_path / "cache")
+    path = _write_csv(tmp_path / "data.csv", ["M", "B"])
+    first = store.load(path)
+    second = store.load(path)
+
+    assert second.source_hash == first.source_hash
+    np.testing.assert_array_equal(second.features, first.features)
+    assert len(list((tmp_path / "cache").glob("*/meta.json"))) == 1
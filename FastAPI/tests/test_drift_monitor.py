@@ -0,0 +1,27 @@
+"""
+Tests for the streaming drift monitor baseline.
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.dataset_store import DatasetStore
+
+
+def test_training_data_shows_no_drift():
+    with TestClient(app):
+        ml_service = app.state.ml_service
+        drift_monitor = app.state.drift_monitor
+        assert drift_monitor.probability_reference is not None
+
+        reference = DatasetStore.from_settings().load(settings.DRIFT_REFERENCE_DATA)
+        features = np.asarray(reference.features)
+        drift_monitor.update(features, ml_service.predict_proba_batch(features))
+        report = drift_monitor.report()
+
+    assert report["window_rows"] == features.shape[0]
+    assert report["drifted_features"] == []
+    assert max(f["psi"] for f in report["features"].values()) < 0.01
+    assert report["probability"]["psi"] < 0.01
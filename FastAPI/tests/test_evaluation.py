@@ -0,0 +1,86 @@
+"""
+Tests for the vectorized evaluation engine.
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+from app.services.evaluation import (
+    _auc_from_weights, _resample_counts, bootstrap_metrics, default_chunk_size, evaluate_model
+)
+from app.services.ml_service import MLService, RISK_TIERS
+
+from conftest import REPO_ROOT
+
+
+@pytest.fixture(scope="module")
+def ml_service():
+    service = MLService(models_dir=settings.MODELS_DIR)
+    service.load_models()
+    return service
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    return DatasetStore(tmp_path_factory.mktemp("dataset_cache")).load(REPO_ROOT / "data.csv")
+
+
+def test_weighted_auc_matches_sklearn_on_resamples():
+    rng = np.random.default_rng(0)
+    n = 200
+    labels = rng.integers(0, 2, size=n)
+    # Rounded scores so the resamples contain ties
+    scores = np.round(rng.random(n) * 0.5 + labels * 0.3, 2)
+    index_matrix = rng.integers(0, n, size=(25, n))
+
+    weighted = _auc_from_weights(_resample_counts(index_matrix, n), scores, labels)
+    expected = [roc_auc_score(labels[idx], scores[idx]) for idx in index_matrix]
+
+    np.testing.assert_allclose(weighted, expected, rtol=1e-12)
+
+
+def test_empty_group_gives_nan():
+    weights = np.ones((3, 0))
+    empty = np.array([])
+
+    auc = _auc_from_weights(weights, empty, empty)
+
+    assert auc.shape == (3,)
+    assert np.isnan(auc).all()
+
+
+def test_empty_risk_tier_does_not_crash(ml_service, dataset):
+    malignant = np.flatnonzero(np.asarray(dataset.labels) == 1)[:5]
+    features = np.asarray(dataset.features)[malignant]
+    labels = np.asarray(dataset.labels)[malignant]
+
+    report = evaluate_model(ml_service, features, labels, n_bootstrap=20, chunk_size=7)
+
+    assert report["overall"]["n"] == 5
+    assert report["overall"]["roc_auc"] is None
+    empty = [tier for tier in RISK_TIERS if report["by_risk_tier"][tier]["n"] == 0]
+    assert empty
+    for tier in empty:
+        assert report["by_risk_tier"][tier]["sensitivity"] is None
+        assert report["by_risk_tier"][tier]["confidence_intervals"]["roc_auc"] is None
+
+
+def test_default_chunk_size_scales_with_rows():
+    assert default_chunk_size(569, 100) == 100
+    large = default_chunk_size(100_000, 10_000)
+    assert 1 <= large < 1000
+    assert default_chunk_size(10**9, 10_000) == 1
+
+
+def test_bootstrap_uses_sized_chunks(ml_service, dataset):
+    scores = ml_service.predict_proba_batch(dataset.features)
+    labels = np.asarray(dataset.labels)
+    tiers = ml_service.stratify_risk_batch(scores)
+
+    samples = bootstrap_metrics(scores, labels, scores > 0.5, tiers, n_bootstrap=50, chunk_size=16)
+
+    assert samples["overall"]["roc_auc"].shape == (50,)
+    assert set(samples) == {"overall", *RISK_TIERS}
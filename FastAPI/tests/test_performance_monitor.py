@@ -0,0 +1,48 @@
+"""
+Tests for live performance monitoring from late-arriving labels.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.performance_monitor import PerformanceMonitor
+
+
+def test_repeated_label_is_counted_once():
+    monitor = PerformanceMonitor()
+    monitor.record_predictions(["c1", "c2"], [0.9, 0.1], ["High", "Low"])
+
+    assert monitor.record_labels([("c1", 1), ("c2", 0)]) == {
+        "matched": 2, "unmatched": 0, "duplicates": 0, "corrected": 0,
+    }
+    assert monitor.record_labels([("c1", 1)])["duplicates"] == 1
+
+    report = monitor.report()
+    assert report["overall"]["n"] == 2
+    assert report["unmatched_labels"] == 0
+    assert report["duplicate_labels"] == 1
+
+
+def test_changed_label_corrects_the_join():
+    monitor = PerformanceMonitor()
+    monitor.record_predictions(["c1"], [0.9], ["High"])
+    monitor.record_labels([("c1", 1)])
+
+    assert monitor.record_labels([("c1", 0)])["corrected"] == 1
+
+    overall = monitor.report()["overall"]
+    assert overall["n"] == 1
+    assert (overall["true_positives"], overall["false_positives"]) == (0, 1)
+
+
+def test_labels_endpoint_requires_admin_token(monkeypatch):
+    body = {"labels": [{"case_id": "c1", "diagnosis": "Malignant"}]}
+    with TestClient(app) as client:
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        assert client.post(f"{settings.API_PREFIX}/labels", json=body).status_code == 403
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        response = client.post(f"{settings.API_PREFIX}/labels", json=body, headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["unmatched"] == 1
@@ -0,0 +1,37 @@
+"""
+Tests for float32 inference parity.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.dataset_store import DatasetStore
+from app.services.ml_service import MLService
+from app.services.precision_check import check_float32_parity
+
+from conftest import REPO_ROOT
+
+
+@pytest.fixture(scope="module")
+def ml_service():
+    service = MLService(models_dir=settings.MODELS_DIR)
+    service.load_models()
+    return service
+
+
+def test_float32_scoring_matches_float64_on_training_data(ml_service, tmp_path):
+    features = DatasetStore(tmp_path).load(REPO_ROOT / "data.csv").features
+
+    result = check_float32_parity(ml_service, features)
+
+    assert result["n_samples"] == features.shape[0]
+    assert result["float64_tier_flips"] == 0
+    assert result["float32_tier_flips"] == 0
+    assert result["float32_diagnosis_flips"] == 0
+    assert result["passed"]
+
+
+def test_unloaded_model_is_rejected():
+    with pytest.raises(ValueError, match="not loaded"):
+        check_float32_parity(MLService(models_dir=settings.MODELS_DIR), np.zeros((1, 30)))
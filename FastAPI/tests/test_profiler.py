@@ -0,0 +1,39 @@
+"""
+Tests for on-demand request profiling.
+"""
+
+import cProfile
+import marshal
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+def test_cprofile_session_captures_predict(feature_payload):
+    with TestClient(app) as client:
+        app.state.profiler.start(f"{settings.API_PREFIX}/predict", requests=1)
+        response = client.post(f"{settings.API_PREFIX}/predict", json=feature_payload)
+        status = app.state.profiler.status()
+        exported = app.state.profiler.export()
+
+    assert response.status_code == 200
+    assert status["session"]["completed_requests"] == 1
+    assert marshal.loads(exported)
+
+
+def test_profiling_failure_falls_back_to_unprofiled(feature_payload, monkeypatch):
+    def busy(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", busy)
+    with TestClient(app) as client:
+        app.state.profiler.start(f"{settings.API_PREFIX}/predict", requests=2)
+        responses = [client.post(f"{settings.API_PREFIX}/predict", json=feature_payload) for _ in range(2)]
+        status = app.state.profiler.status()
+
+    assert [r.status_code for r in responses] == [200, 200]
+    # The loop-profile slot is released even though no profile ran
+    assert status["session"]["completed_requests"] == 2
+    assert status["session"]["skipped_requests"] == 0
@@ -0,0 +1,92 @@
+"""
+Tests for bootstrap-ensemble prediction uncertainty.
+"""
+
+import shutil
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.services.dataset_store import DatasetStore
+from app.services.ensemble import fit_bootstrap_ensemble, save_ensemble
+from app.services.ml_service import MLService
+
+from conftest import REPO_ROOT
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    return DatasetStore(tmp_path_factory.mktemp("dataset_cache")).load(REPO_ROOT / "data.csv")
+
+
+@pytest.fixture(scope="module")
+def trained_ensemble(tmp_path_factory, dataset):
+    models_dir = tmp_path_factory.mktemp("models")
+    for path in settings.MODELS_DIR.glob("*.pkl"):
+        shutil.copy(path, models_dir / path.name)
+
+    service = MLService(models_dir=models_dir)
+    service.load_models()
+    weights, intercepts = fit_bootstrap_ensemble(
+        service, dataset.features, dataset.labels, n_models=20, seed=0
+    )
+    return models_dir, service, weights, intercepts
+
+
+def _reload(models_dir, model_id, weights, intercepts, **metadata) -> MLService:
+    save_ensemble(models_dir / f"ensemble_{model_id}.npz", weights, intercepts, seed=0, **metadata)
+    service = MLService(models_dir=models_dir)
+    service.load_models()
+    return service
+
+
+@pytest.fixture(scope="module")
+def ensemble_service(trained_ensemble):
+    models_dir, service, weights, intercepts = trained_ensemble
+    return _reload(models_dir, service.model_id, weights, intercepts, model_fingerprint=service.model_fingerprint)
+
+
+def test_interval_brackets_served_probability(ensemble_service, dataset):
+    features = np.asarray(dataset.features)
+    uncertainty = ensemble_service.predict_uncertainty_batch(features)
+
+    assert ensemble_service.ensemble_size == 20
+    np.testing.assert_allclose(uncertainty["probability"], ensemble_service.predict_proba_batch(features))
+    assert (uncertainty["lower"] <= uncertainty["probability"]).all()
+    assert (uncertainty["probability"] <= uncertainty["upper"]).all()
+    assert ((uncertainty["tier_stability"] >= 0) & (uncertainty["tier_stability"] <= 1)).all()
+
+
+def test_wider_interval_contains_narrower(ensemble_service, dataset):
+    features = np.asarray(dataset.features)[:50]
+    narrow = ensemble_service.predict_uncertainty_batch(features, interval=0.5)
+    wide = ensemble_service.predict_uncertainty_batch(features, interval=0.95)
+
+    assert (wide["lower"] <= narrow["lower"]).all()
+    assert (narrow["upper"] <= wide["upper"]).all()
+
+
+def test_no_ensemble_returns_none():
+    service = MLService(models_dir=settings.MODELS_DIR)
+    service.load_models()
+
+    assert service.predict_uncertainty_batch(np.zeros((1, settings.EXPECTED_FEATURES))) is None
+
+
+@pytest.mark.parametrize("metadata", [{"model_fingerprint": "0" * 64}, {}])
+def test_ensemble_for_other_model_is_ignored(trained_ensemble, metadata):
+    models_dir, service, weights, intercepts = trained_ensemble
+    mismatched = _reload(models_dir, service.model_id, weights, intercepts, **metadata)
+
+    assert mismatched.ensemble_size == 0
+    assert mismatched.predict_uncertainty_batch(np.zeros((1, settings.EXPECTED_FEATURES))) is None
+
+
+@pytest.mark.parametrize("interval", [0.0, 1.0, 90])
+def test_interval_must_lie_between_zero_and_one(ensemble_service, interval):
+    with pytest.raises(ValidationError):
+        Settings(UNCERTAINTY_INTERVAL=interval)
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        ensemble_service.predict_uncertainty_batch(np.zeros((1, settings.EXPECTED_FEATURES)), interval=interval)
@@ -56,6 +56,14 @@ export interface ExplanationItem {
   direction: "increases risk" | "decreases risk" | "no effect";
 }
 
+export interface PredictionUncertainty {
+  probability_lower: number;
+  probability_upper: number;
+  tier_stability: number;
+  interval: number;
+  ensemble_size: number;
+}
+
 export interface PredictionResponse {
   diagnosis: "Benign" | "Malignant";
   confidence: number;
@@ -68,6 +76,7 @@ export interface PredictionResponse {
   model_version: string;
   timestamp: string;
   explanations?: ExplanationItem[];
+  uncertainty?: PredictionUncertainty | null;
 }
 
 export interface RiskStratificationResponse {
@@ -88,6 +97,36 @@ export interface RiskStratificationResponse {
   model_version: string;
   timestamp: string;
   explanations?: ExplanationItem[];
+  uncertainty?: PredictionUncertainty | null;
+}
+
+export interface SweepAxis {
+  feature: keyof FeaturesInput;
+  start: number;
+  stop: number;
+  steps?: number;
+}
+
+export interface TierBoundary {
+  threshold: number;
+  from_tier: "Low" | "Medium";
+  to_tier: "Medium" | "High";
+  // Feature values (one axis) or [x, y] points (two axes) where the tier changes
+  crossings: number[] | [number, number][];
+}
+
+export interface WhatIfResponse {
+  features: string[];
+  values: number[][];
+  // Curve (one axis) or surface indexed [axis 0][axis 1] (two axes)
+  probabilities: number[] | number[][];
+  risk_categories: string[] | string[][];
+  base_probability: number;
+  base_risk_category: "Low" | "Medium" | "High";
+  boundaries: TierBoundary[];
+  grid_size: number;
+  model_version: string;
+  processing_time: number;
 }
 
 /* =========================================================
@@ -142,3 +181,23 @@ export async function riskStratify(
 
   return res.json();
 }
+
+/* ---------- What-if Sensitivity Sweep ---------- */
+export async function whatIfSweep(
+  data: FeaturesInput,
+  axes: SweepAxis[]
+): Promise<WhatIfResponse> {
+  const res = await fetch(`${API_URL}/api/v1/what-if`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ features: data, axes }),
+  });
+
+  if (!res.ok) {
+    throw new Error("What-if sweep request failed");
+  }
+
+  return res.json();
+}